@@ -1,43 +1,423 @@
 import os
 import re
-from typing import Dict, List
-from openai import OpenAI
+import json
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from rule_engine import Rule, rule_engine
+from script_detector import is_likely_non_english
+from result_cache import ResultCache, cache_key
+from text_chunks import chunk_text
+from single_flight import SingleFlight
+from llm_gateway import BULK, LLMGateway, llm_gateway
+
 load_dotenv()
 
-# Initialize OpenAI client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-client = None
-if openai_api_key:
-    try:
-        client = OpenAI(api_key=openai_api_key)
-    except Exception as e:
-        print(f"Warning: Could not initialize OpenAI client: {e}")
+# Bump whenever the OpenAI prompt, model or chunk merging changes, so cached results are not reused
+PROMPT_VERSION = "3"
+
+# Long documents are analyzed in chunks of at most ANALYSIS_CHUNK_CHARS characters,
+# with at most ANALYSIS_CONCURRENCY OpenAI calls in flight
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", "12000"))
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+# Cost cap: beyond this many chunks, the remaining ones get rule-based analysis only
+ANALYSIS_MAX_CHUNKS = int(os.getenv("ANALYSIS_MAX_CHUNKS", "20"))
+# Latency budget for OpenAI analysis in seconds ("off" waits for OpenAI however long it takes).
+# When it is exceeded, the rule-based result is returned flagged as provisional and the
+# OpenAI analysis finishes in the background to fill the result cache.
+_deadline_env = os.getenv("ANALYSIS_DEADLINE", "10")
+ANALYSIS_DEADLINE = None if _deadline_env.lower() in ("", "off", "none") else float(_deadline_env)
+# Rule analysis of large texts runs in a process pool so batches use every core
+# (ANALYSIS_PROCESSES=0 means one worker per CPU, 1 keeps it in worker threads)
+ANALYSIS_PROCESSES = int(os.getenv("ANALYSIS_PROCESSES", "0")) or (os.cpu_count() or 1)
+RULES_PROCESS_MIN_CHARS = int(os.getenv("RULES_PROCESS_MIN_CHARS", "20000"))
+# Tiered mode ("ANALYSIS_MODE=tiered"): the rule-based analysis runs first and documents
+# it classifies as clearly Low or clearly High (confidence at or above these thresholds)
+# skip OpenAI; only ambiguous ones are escalated. "llm" sends every document to OpenAI.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "llm").lower()
+TIER_LOW_CONFIDENCE = float(os.getenv("TIER_LOW_CONFIDENCE", "0.9"))
+TIER_HIGH_CONFIDENCE = float(os.getenv("TIER_HIGH_CONFIDENCE", "0.6"))
+MAX_MERGED_ALERTS = 10
+MAX_MERGED_SUMMARY_PARTS = 3
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+# Rule points at which the rule-based risk score becomes Medium / High
+MEDIUM_RISK_POINTS = 2
+HIGH_RISK_POINTS = 4
+NO_CONCERNS_ALERT = "No major concerns detected, but always review Terms and Conditions carefully."
+
+# OpenAI calls go through the shared gateway (rate limits, priorities, retries);
+# None when no API key is configured
+client: Optional[LLMGateway] = llm_gateway if llm_gateway.configured else None
+
+# Cap on one document's concurrent OpenAI calls, per event loop
+_openai_semaphore = None
+_semaphore_loop = None
+
+# Process pool for rule analysis, created on first use
+_rules_pool = None
+_rules_pool_lock = threading.Lock()
+
+# OpenAI analyses still running after the deadline
+_background_tasks = set()
+
+result_cache = ResultCache()
+
+# In-flight analyses by cache key, shared by concurrent requests for the same text
+analysis_flights = SingleFlight()
+
+# Tiered mode outcomes: settled by the rule engine or escalated to OpenAI
+tier_stats = {"settled_by_rules": 0, "escalated": 0}
+
+
+def analyzer_client_configured() -> bool:
+    """True if analyses go to OpenAI (an API key is configured)."""
+    return client is not None
+
+
+def analyze_text(text: str, deadline: Optional[float] = None) -> Dict[str, any]:
+    """
+    Synchronous wrapper around async_analyze_text for callers that are not
+    running inside an event loop. No deadline by default: analyses still
+    running when the wrapper returns are cancelled.
+    """
+    async def _run():
+        try:
+            return await async_analyze_text(text, deadline=deadline)
+        finally:
+            await llm_gateway.close()
+
+    return asyncio.run(_run())
 
 
-def analyze_text(text: str) -> Dict[str, any]:
+async def async_analyze_text(text: str, deadline: Optional[float] = ANALYSIS_DEADLINE) -> Dict[str, any]:
     """
     Analyze Terms and Conditions text and extract:
     - Summary
     - Risk score (Low/Medium/High)
     - Alert list
+    - "provisional": True if OpenAI missed the deadline and the result comes
+      from the rule-based analysis (the key is absent otherwise)
     """
     # Use OpenAI if available, otherwise use rule-based analysis
-    if client:
-        return analyze_with_openai(text)
+    if client and tiered_analysis():
+        key = cache_key(text, "tiered", f"{PROMPT_VERSION}:{rule_engine.version}")
+    elif client:
+        key = cache_key(text, "openai", PROMPT_VERSION)
     else:
-        return analyze_with_rules(text)
+        key = cache_key(text, "rules", rule_engine.version)
+
+    cached = await asyncio.to_thread(result_cache.get, key)
+    if cached is not None:
+        return cached
+
+    return await analysis_flights.run(("analyze", key), lambda: analyze_uncached(text, key, deadline))
+
+
+async def analyze_uncached(text: str, key: str, deadline: Optional[float]) -> Dict[str, any]:
+    if client and tiered_analysis():
+        rules = await run_rules(analyze_with_rules, text)
+        if settled_by_rules(rules):
+            await asyncio.to_thread(result_cache.set, key, rules)
+            return rules
+        return await race_openai_analysis(
+            ("openai", key),
+            lambda: analyze_and_cache(text, key),
+            lambda: already_done(rules),
+            deadline
+        )
+
+    if client:
+        return await race_openai_analysis(
+            ("openai", key),
+            lambda: analyze_and_cache(text, key),
+            lambda: run_rules(analyze_with_rules, text),
+            deadline
+        )
+
+    result = await run_rules(analyze_with_rules, text)
+    await asyncio.to_thread(result_cache.set, key, result)
+    return result
+
+
+def tiered_analysis() -> bool:
+    return ANALYSIS_MODE == "tiered"
+
+
+def settled_by_rules(rules: Dict[str, any]) -> bool:
+    """
+    Tiered mode: True if the rule-based result is confident enough to return
+    as is, False if the document should be escalated to OpenAI.
+    """
+    confidence = rules.get("confidence", 0.0)
+    settled = (
+        (rules["risk_score"] == "Low" and confidence >= TIER_LOW_CONFIDENCE)
+        or (rules["risk_score"] == "High" and confidence >= TIER_HIGH_CONFIDENCE)
+    )
+    tier_stats["settled_by_rules" if settled else "escalated"] += 1
+    return settled
+
+
+def tier_report() -> dict:
+    """Tiered mode counters plus the share of documents escalated to OpenAI."""
+    decided = tier_stats["settled_by_rules"] + tier_stats["escalated"]
+    return dict(
+        tier_stats,
+        mode=ANALYSIS_MODE,
+        escalation_rate=round(tier_stats["escalated"] / decided, 3) if decided else None
+    )
+
+
+async def race_openai_analysis(
+    flight_key,
+    openai_analysis: Callable[[], Awaitable[Dict[str, any]]],
+    rules_analysis: Callable[[], Awaitable[Dict[str, any]]],
+    deadline: Optional[float]
+) -> Dict[str, any]:
+    """
+    Run an OpenAI analysis with the rule-based analysis alongside it. If
+    OpenAI fails, the rule-based result is returned; if it misses the deadline,
+    the rule-based result is returned flagged provisional and OpenAI keeps
+    running in the background (caching its own result).
+    """
+    # A request arriving while an earlier OpenAI analysis of the same text is
+    # still running in the background joins it instead of starting another
+    openai_task = asyncio.ensure_future(analysis_flights.run(flight_key, openai_analysis))
+    rules_task = None
+    if deadline is not None:
+        rules_task = asyncio.ensure_future(rules_analysis())
+
+    await asyncio.wait({openai_task}, timeout=deadline)
+    if not openai_task.done():
+        run_in_background(finish_openai_analysis(openai_task))
+        return dict(await rules_task, provisional=True)
+
+    try:
+        return openai_task.result()
+    except Exception as e:
+        print(f"OpenAI analysis failed: {e}, falling back to rule-based analysis")
+        if rules_task is None:
+            return await rules_analysis()
+        return await rules_task
+
+
+async def already_done(result: Dict[str, any]) -> Dict[str, any]:
+    """A result that is already known, as the coroutine race_openai_analysis expects."""
+    return result
+
+
+async def analyze_and_cache(text: str, key: str) -> Dict[str, any]:
+    """
+    OpenAI analysis of the whole document, cached unless some chunks fell
+    back to rules (so the next call retries OpenAI for them).
+    """
+    result, complete = await analyze_chunks_with_openai(text)
+    if complete:
+        await asyncio.to_thread(result_cache.set, key, result)
+    return result
+
+
+async def finish_openai_analysis(openai_task: asyncio.Future) -> None:
+    """Wait for an OpenAI analysis that missed the deadline (it caches its own result)."""
+    try:
+        await openai_task
+    except Exception as e:
+        print(f"Background OpenAI analysis failed: {e}")
+
+
+def run_in_background(coro) -> asyncio.Task:
+    """Schedule a fire-and-forget coroutine, keeping a reference until it finishes."""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 
 def analyze_with_openai(text: str) -> Dict[str, any]:
     """Analyze text using OpenAI API."""
+    async def _run():
+        try:
+            result, _ = await analyze_chunks_with_openai(text)
+            return result
+        finally:
+            await llm_gateway.close()
+
     try:
-        # Truncate text if too long (OpenAI has token limits)
-        max_chars = 12000
-        text_to_analyze = text[:max_chars] if len(text) > max_chars else text
+        return asyncio.run(_run())
+    except Exception as e:
+        print(f"OpenAI analysis failed: {e}, falling back to rule-based analysis")
+        return analyze_with_rules(text)
+
+
+async def run_rules(func, *args):
+    """
+    Run a CPU-bound rule analysis function without blocking the event loop: in
+    the rule process pool if its text arguments are large enough to be worth
+    the transfer, otherwise in a worker thread. The pool is awaited directly,
+    so no worker thread sits blocked while a process does the work.
+    """
+    size = sum(
+        len(arg) if isinstance(arg, str) else sum(map(len, arg))
+        for arg in args if isinstance(arg, (str, list))
+    )
+    pool = get_rules_pool() if size >= RULES_PROCESS_MIN_CHARS else None
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            shutdown_rules_pool()
+    return await asyncio.to_thread(func, *args)
+
+
+def get_rules_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared rule-analysis process pool, or None when running with one process."""
+    global _rules_pool
+    if ANALYSIS_PROCESSES <= 1:
+        return None
+    with _rules_pool_lock:
+        if _rules_pool is None:
+            # Spawned (not forked) workers, since the server process runs threads
+            _rules_pool = ProcessPoolExecutor(
+                max_workers=ANALYSIS_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _rules_pool
+
+
+def shutdown_rules_pool() -> None:
+    global _rules_pool
+    with _rules_pool_lock:
+        if _rules_pool is not None:
+            _rules_pool.shutdown(wait=False, cancel_futures=True)
+            _rules_pool = None
+
+
+def get_openai_semaphore() -> asyncio.Semaphore:
+    """
+    Cap on one document's concurrent OpenAI calls for the running event loop
+    (the gateway limits all calls together).
+    """
+    global _openai_semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _openai_semaphore is None or _semaphore_loop is not loop:
+        _openai_semaphore = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+        _semaphore_loop = loop
+    return _openai_semaphore
+
+
+async def analyze_chunks_with_openai(text: str) -> Tuple[Dict[str, any], bool]:
+    """
+    Map-reduce analysis of the whole document: split it on clause boundaries,
+    analyze the chunks concurrently and merge the results. Returns the merged
+    result and whether every chunk got an OpenAI analysis (False if some chunks
+    fell back to rules after an error). Raises if every OpenAI call failed.
+    """
+    chunks = chunk_text(text, ANALYSIS_CHUNK_CHARS) or [text]
+    selected = select_chunks(chunks, ANALYSIS_MAX_CHUNKS)
+    semaphore = get_openai_semaphore()
+
+    async def analyze_chunk(index: int):
+        if index not in selected:
+            return await run_rules(analyze_with_rules, chunks[index]), False
+        try:
+            async with semaphore:
+                return await request_openai_analysis(chunks[index]), True
+        except Exception as e:
+            return e, False
+
+    outcomes = await asyncio.gather(*(analyze_chunk(index) for index in range(len(chunks))))
+
+    errors = [outcome for outcome, _ in outcomes if isinstance(outcome, Exception)]
+    if selected and len(errors) == len(selected):
+        raise errors[0]
+
+    results = []
+    for index, (outcome, from_openai) in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            print(f"OpenAI analysis of chunk {index + 1}/{len(chunks)} failed: {outcome}, using rule-based analysis")
+            outcome = await run_rules(analyze_with_rules, chunks[index])
+        results.append((outcome, from_openai))
+    return merge_chunk_results(results), not errors
+
+
+def select_chunks(chunks: List[str], max_chunks: int) -> set:
+    """
+    Indices of the chunks to send to OpenAI: all of them, or if there are too
+    many, the ones where the rule engine finds the most risk (earliest first on ties).
+    """
+    if len(chunks) <= max_chunks:
+        return set(range(len(chunks)))
+    points = [sum(rule.points for rule in rule_engine.match(chunk.lower())) for chunk in chunks]
+    ranked = sorted(range(len(chunks)), key=lambda index: (-points[index], index))
+    return set(ranked[:max_chunks])
+
+
+def merge_chunk_results(results: List[Tuple[Dict[str, any], bool]]) -> Dict[str, any]:
+    """
+    Combine per-chunk (result, from_openai) pairs without another model call:
+    the highest risk wins, alerts are de-duplicated in document order, and the
+    summary is built from the distinct first sentences of the OpenAI summaries
+    of the riskiest chunks.
+    """
+    if len(results) == 1:
+        return results[0][0]
+
+    risk = max(RISK_LEVELS.index(result["risk_score"]) for result, _ in results)
+
+    alerts = []
+    seen = set()
+    for result, _ in results:
+        for alert in result["alerts"]:
+            normalized = re.sub(r"\W+", " ", alert).strip().lower()
+            if alert == NO_CONCERNS_ALERT or not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            alerts.append(alert)
+    if not alerts:
+        alerts.append(NO_CONCERNS_ALERT)
+
+    summarized = [
+        (RISK_LEVELS.index(result["risk_score"]), index, first_sentence(result["summary"]))
+        for index, (result, from_openai) in enumerate(results) if from_openai
+    ] or [
+        (RISK_LEVELS.index(result["risk_score"]), index, first_sentence(result["summary"]))
+        for index, (result, _) in enumerate(results)
+    ]
+    summarized.sort(key=lambda item: (-item[0], item[1]))
+    parts = []
+    seen = set()
+    for part in summarized:
+        normalized = re.sub(r"\W+", " ", part[2]).strip().lower()
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            parts.append(part)
+    parts = sorted(parts[:MAX_MERGED_SUMMARY_PARTS], key=lambda item: item[1])
+    summary = " ".join(sentence for _, _, sentence in parts)
 
-        prompt = f"""Analyze the following Terms and Conditions text and provide:
+    return {
+        "summary": summary,
+        "risk_score": RISK_LEVELS[risk],
+        "alerts": alerts[:MAX_MERGED_ALERTS]
+    }
+
+
+def first_sentence(text: str) -> str:
+    match = re.match(r".+?[.!?](?=\s|$)", text.strip(), re.S)
+    return match.group(0) if match else text.strip()
+
+
+async def request_openai_analysis(text: str) -> Dict[str, any]:
+    """One OpenAI analysis call; raises on API or parsing errors."""
+    # Chunks are already small; this only guards against token limits
+    text_to_analyze = text[:ANALYSIS_CHUNK_CHARS]
+
+    prompt = f"""Analyze the following Terms and Conditions text and provide:
 1. A simplified summary (2-3 sentences) IN ENGLISH
 2. A risk score: Low, Medium, or High
 3. A list of alerts (bullet points) for concerning clauses IN ENGLISH
@@ -62,42 +442,44 @@ Respond in this exact JSON format (all text must be in English):
 }}
 """
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a legal analysis assistant. Always respond with valid JSON only. Always provide summaries and alerts in English, regardless of the input language."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        # Try to extract JSON from response
-        import json
-        # Remove markdown code blocks if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(content)
-
-        # Validate and normalize risk score
-        risk_score = result.get("risk_score", "Medium")
-        if risk_score not in ["Low", "Medium", "High"]:
-            risk_score = "Medium"
-
-        return {
-            "summary": result.get("summary", "Unable to generate summary."),
-            "risk_score": risk_score,
-            "alerts": result.get("alerts", [])
-        }
+    response = await llm_gateway.complete(
+        "analysis",
+        BULK,
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a legal analysis assistant. Always respond with valid JSON only. Always provide summaries and alerts in English, regardless of the input language."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=1000
+    )
+
+    return normalize_analysis(parse_json_response(response.choices[0].message.content))
+
+
+def parse_json_response(content: str):
+    """Parse a JSON answer from the model, which may be wrapped in a markdown code block."""
+    content = content.strip()
+    # Remove markdown code blocks if present
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    return json.loads(content)
+
+
+def normalize_analysis(result: dict) -> Dict[str, any]:
+    """summary / risk_score / alerts from a model answer, with a valid risk score."""
+    # Validate and normalize risk score
+    risk_score = result.get("risk_score", "Medium")
+    if risk_score not in RISK_LEVELS:
+        risk_score = "Medium"
 
-    except Exception as e:
-        print(f"OpenAI analysis failed: {e}, falling back to rule-based analysis")
-        return analyze_with_rules(text)
+    return {
+        "summary": result.get("summary", "Unable to generate summary."),
+        "risk_score": risk_score,
+        "alerts": result.get("alerts", [])
+    }
 
 
 def analyze_with_rules(text: str) -> Dict[str, any]:
@@ -108,25 +490,13 @@ def analyze_with_rules(text: str) -> Dict[str, any]:
     """
     text_lower = text.lower()
     
-    # Detect if text appears to be non-English (simple heuristic)
-    # Check for common non-English characters/patterns
-    non_english_indicators = [
-        r'[àáâãäåæçèéêëìíîïñòóôõöùúûüýÿ]',  # Common accented characters
-        r'[ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÑÒÓÔÕÖÙÚÛÜÝŸ]',
-        r'[α-ωΑ-Ω]',  # Greek
-        r'[一-龯]',  # Chinese/Japanese/Korean (CJK)
-        r'[А-Яа-я]',  # Cyrillic
-        r'[א-ת]',  # Hebrew
-        r'[ا-ي]',  # Arabic
-    ]
-    
-    is_likely_non_english = any(re.search(pattern, text) for pattern in non_english_indicators)
-    
-    if is_likely_non_english:
+    # Detect if text appears to be non-English from its mix of writing systems
+    if is_likely_non_english(text):
         # For non-English text, provide a note that OpenAI is recommended
         return {
             "summary": "This document appears to be in a non-English language. For accurate analysis of non-English Terms & Conditions, please configure an OpenAI API key. The system can analyze multilingual content when OpenAI is available.",
             "risk_score": "Medium",
+            "confidence": 0.0,
             "alerts": [
                 "Document appears to be in a non-English language",
                 "For best results with multilingual content, use OpenAI API",
@@ -134,77 +504,28 @@ def analyze_with_rules(text: str) -> Dict[str, any]:
             ]
         }
 
-    alerts = []
-    risk_score = "Low"
-    risk_points = 0
-
-    # Payment and subscription detection
-    payment_patterns = [
-        r"automatic.*renewal",
-        r"auto.*renew",
-        r"recurring.*charge",
-        r"subscription.*fee",
-        r"hidden.*fee",
-        r"processing.*fee",
-        r"cancellation.*fee",
-    ]
-
-    for pattern in payment_patterns:
-        if re.search(pattern, text_lower):
-            alerts.append("Contains automatic renewal or recurring payment clauses")
-            risk_points += 2
-            break
-
-    # Data collection detection
-    data_patterns = [
-        r"collect.*personal.*data",
-        r"share.*third.*party",
-        r"sell.*data",
-        r"data.*collection",
-        r"tracking.*cookies",
-        r"analytics.*data",
-    ]
-
-    for pattern in data_patterns:
-        if re.search(pattern, text_lower):
-            alerts.append("Collects and may share personal data with third parties")
-            risk_points += 1
-            break
-
-    # Risky legal clauses
-    legal_patterns = [
-        r"arbitration.*only",
-        r"waive.*liability",
-        r"no.*refund",
-        r"as.*is.*basis",
-        r"disclaim.*warranty",
-        r"limit.*liability",
-    ]
+    # Single scan over the text for all rule keywords (see rule_engine)
+    return summarize_rule_matches(rule_engine.match(text_lower))
 
-    for pattern in legal_patterns:
-        if re.search(pattern, text_lower):
-            alerts.append("Contains restrictive legal clauses (arbitration, liability waivers)")
-            risk_points += 2
-            break
 
-    # Cancellation restrictions
-    if re.search(r"no.*cancel|cancel.*not.*allowed|cancel.*restriction", text_lower):
-        alerts.append("Restrictive cancellation policy")
-        risk_points += 1
+def summarize_rule_matches(matched_rules: List[Rule]) -> Dict[str, any]:
+    """Risk score, summary and alerts for the rules that matched a document."""
+    alerts = [rule.alert for rule in matched_rules]
+    risk_points = sum(rule.points for rule in matched_rules)
 
     # Determine risk score
-    if risk_points >= 4:
+    if risk_points >= HIGH_RISK_POINTS:
         risk_score = "High"
-    elif risk_points >= 2:
+    elif risk_points >= MEDIUM_RISK_POINTS:
         risk_score = "Medium"
     else:
         risk_score = "Low"
 
     # Generate summary
     summary_parts = []
-    if risk_points >= 4:
+    if risk_points >= HIGH_RISK_POINTS:
         summary_parts.append("This document contains multiple high-risk clauses.")
-    elif risk_points >= 2:
+    elif risk_points >= MEDIUM_RISK_POINTS:
         summary_parts.append("This document contains some concerning clauses.")
     else:
         summary_parts.append("This document appears relatively standard.")
@@ -218,11 +539,26 @@ def analyze_with_rules(text: str) -> Dict[str, any]:
 
     # Ensure at least one alert
     if not alerts:
-        alerts.append("No major concerns detected, but always review Terms and Conditions carefully.")
+        alerts.append(NO_CONCERNS_ALERT)
 
     return {
         "summary": summary,
         "risk_score": risk_score,
+        "confidence": rule_confidence(risk_points),
         "alerts": alerts
     }
 
+
+def rule_confidence(risk_points: int) -> float:
+    """
+    How clearly the rule points fall inside the Low or High band, from 0 to 1:
+    1.0 for no matches, falling towards the Medium band, and rising from the
+    High threshold to every rule matched. Medium scores have no confidence.
+    """
+    if risk_points < MEDIUM_RISK_POINTS:
+        return round(1 - risk_points / MEDIUM_RISK_POINTS, 3)
+    if risk_points >= HIGH_RISK_POINTS:
+        max_points = max(sum(rule.points for rule in rule_engine.rules), HIGH_RISK_POINTS)
+        return round((risk_points - HIGH_RISK_POINTS + 1) / (max_points - HIGH_RISK_POINTS + 1), 3)
+    return 0.0
+
@@ -0,0 +1,250 @@
+"""
+Benchmarks for the ClauseGuard backend.
+
+Usage (from the backend directory):
+    python benchmarks.py render URL [URL ...]
+    python benchmarks.py extract [HTML_FILE ...]
+    python benchmarks.py rules [--sizes 1,2,5,10] [--legacy-timeout 10]
+"""
+import sys
+import time
+import re
+import random
+import asyncio
+import argparse
+import multiprocessing
+from collections import Counter
+
+from bs4 import BeautifulSoup
+
+import scraper
+from rule_engine import RuleEngine, rule_engine
+
+
+def bench_render(urls):
+    """Render every URL in lean and full Playwright mode and compare bytes and time."""
+    async def run():
+        try:
+            for url in urls:
+                for mode in ("full", "lean"):
+                    try:
+                        text = await scraper.scrape_with_playwright(url, render_mode=mode)
+                        print(f"{mode:5} {len(text):8} chars  {url}")
+                    except Exception as e:
+                        print(f"{mode:5} failed: {getattr(e, 'detail', e)}  {url}")
+        finally:
+            await scraper.close_loop_resources()
+
+    asyncio.run(run())
+    report = scraper.get_render_stats()
+    for mode in ("full", "lean"):
+        if mode in report:
+            stats = report[mode]
+            print(
+                f"{mode:5} pages={stats['pages']} avg_bytes={stats['avg_bytes_loaded']:.0f} "
+                f"avg_blocked={stats['avg_requests_blocked']:.1f} "
+                f"avg_time_to_extract={stats['avg_time_to_extract_ms']:.0f} ms"
+            )
+    if "bytes_saved" in report:
+        print(f"lean saves {report['bytes_saved']:.0f} bytes and {report['time_saved_ms']:.0f} ms per page")
+
+
+def synthetic_pages():
+    """Generated Terms & Conditions pages with common layouts, from small to large."""
+    rng = random.Random(42)
+    words = (
+        "service user agree terms data personal third party fee subscription renewal "
+        "liability warranty arbitration refund cancel account content license privacy "
+        "cookies policy notice law dispute payment provider information rights"
+    ).split()
+
+    def paragraph():
+        sentences = []
+        for _ in range(rng.randint(2, 5)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+            sentences.append(sentence.capitalize() + ",  " + rng.choice(words) + ".")
+        return "<p>" + " ".join(sentences) + "</p>"
+
+    def chrome(body):
+        nav = "<nav>" + "".join(f'<a href="/{w}">{w}</a>' for w in words[:12]) + "</nav>"
+        sidebar = '<div class="sidebar">' + "".join(
+            f'<li><a href="/r/{i}">Related article {i}</a></li>' for i in range(30)
+        ) + "</div>"
+        cookie = '<div class="cookie-consent">We use cookies. Accept all cookies?</div>'
+        return (
+            f"<html><head><title>Terms</title><style>p{{}}</style></head><body>{cookie}"
+            f"<header>Company</header>{nav}{body}{sidebar}<footer>(c) Company</footer>"
+            f"<script>var x = 1;</script></body></html>"
+        )
+
+    for size in (20, 200, 2000):
+        sections = "".join(
+            f"<section><h2>Section {i}</h2>{''.join(paragraph() for _ in range(5))}</section>"
+            for i in range(size // 5)
+        )
+        yield f"main-{size}p", chrome(f"<main>{sections}</main>")
+        yield f"terms-div-{size}p", chrome(f'<div class="wrapper"><div class="terms-body">{sections}</div></div>')
+        yield f"div-soup-{size}p", chrome(
+            f'<div class="container"><div class="row"><div class="col">{sections}</div></div></div>'
+        )
+
+
+def word_f1(expected: str, actual: str) -> float:
+    """Overlap of the two texts' word multisets (1.0 = same words)."""
+    expected_words, actual_words = Counter(expected.split()), Counter(actual.split())
+    common = sum((expected_words & actual_words).values())
+    if not common:
+        return 1.0 if not expected_words and not actual_words else 0.0
+    precision = common / sum(actual_words.values())
+    recall = common / sum(expected_words.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def bench_extract(paths, repeat=3):
+    """
+    Compare extract_clean_text with the scraper's lxml single-pass path
+    (parse_html) for speed and output. Both timings start from raw HTML, so
+    BeautifulSoup parsing counts against the old extractor.
+    """
+    if paths:
+        pages = [(path, open(path, "rb").read()) for path in paths]
+    else:
+        pages = list(synthetic_pages())
+
+    def best_time(func, html):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(html)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    def old_extract(html):
+        return scraper.extract_clean_text(BeautifulSoup(html, "lxml"))
+
+    print(f"{'page':24} {'bytes':>9} {'old ms':>9} {'new ms':>9} {'speedup':>8} {'same':>5} {'word F1':>8}")
+    total_old = total_new = 0.0
+    for name, html in pages:
+        old_time, old_text = best_time(old_extract, html)
+        new_time, new_text = best_time(scraper.parse_html, html)
+        total_old += old_time
+        total_new += new_time
+        print(
+            f"{name[:24]:24} {len(html):9} {old_time * 1000:9.1f} {new_time * 1000:9.1f} "
+            f"{old_time / new_time:7.1f}x {str(old_text == new_text):>5} {word_f1(old_text, new_text):8.3f}"
+        )
+    print(f"total: old {total_old * 1000:.1f} ms, new {total_new * 1000:.1f} ms ({total_old / total_new:.1f}x)")
+
+
+# The per-pattern regexes analyze_with_rules used before rule_engine
+LEGACY_RULE_PATTERNS = {
+    "payment": [
+        r"automatic.*renewal", r"auto.*renew", r"recurring.*charge", r"subscription.*fee",
+        r"hidden.*fee", r"processing.*fee", r"cancellation.*fee",
+    ],
+    "data": [
+        r"collect.*personal.*data", r"share.*third.*party", r"sell.*data",
+        r"data.*collection", r"tracking.*cookies", r"analytics.*data",
+    ],
+    "legal": [
+        r"arbitration.*only", r"waive.*liability", r"no.*refund",
+        r"as.*is.*basis", r"disclaim.*warranty", r"limit.*liability",
+    ],
+    "cancellation": [r"no.*cancel|cancel.*not.*allowed|cancel.*restriction"],
+}
+
+
+def legacy_rule_names(text: str) -> list:
+    return [
+        name for name, patterns in LEGACY_RULE_PATTERNS.items()
+        if any(re.search(pattern, text) for pattern in patterns)
+    ]
+
+
+def _timed_legacy_rules(text: str):
+    started = time.perf_counter()
+    names = legacy_rule_names(text)
+    return time.perf_counter() - started, names
+
+
+def synthetic_terms_text(size_bytes: int, rng: random.Random) -> str:
+    """Lowercased single-line legal text (like scraped text) of about size_bytes."""
+    sentences = [
+        "we may update these terms at any time and will notify you by email.",
+        "your account is personal to you and may not be transferred.",
+        "the service is provided to you for your own personal use.",
+        "you agree not to misuse the platform or interfere with other users.",
+        "hidden features may be enabled for some accounts during testing.",
+        "these terms are governed by the laws of the state of delaware.",
+        "we collect usage information to keep the service secure.",
+        "you may close your account from the settings page.",
+    ]
+    parts, length = [], 0
+    while length < size_bytes:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def bench_rules(sizes_mb, legacy_timeout):
+    """Time rule_engine against the legacy regexes on 1-10 MB inputs."""
+    rng = random.Random(7)
+    exact_engine = RuleEngine(window=None)
+    print(f"{'size':>8} {'engine ms':>10} {'MB/s':>7} {'legacy':>12} {'same rules':>11}")
+    for size_mb in sizes_mb:
+        text = synthetic_terms_text(int(size_mb * 1024 * 1024), rng)
+        # A few real clauses so some rules match
+        text += " auto-renewal applies. we may share data with any third party."
+
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            names = [rule.name for rule in rule_engine.match(text)]
+            timings.append(time.perf_counter() - started)
+        engine_time = min(timings)
+
+        # The legacy regexes backtrack badly; run them in a child process we can kill
+        with multiprocessing.Pool(1) as pool:
+            pending = pool.apply_async(_timed_legacy_rules, (text,))
+            try:
+                legacy_time, legacy_names = pending.get(timeout=legacy_timeout)
+                legacy = f"{legacy_time * 1000:9.0f} ms"
+                exact_names = [rule.name for rule in exact_engine.match(text)]
+                same = str(legacy_names == exact_names and legacy_names == names)
+            except multiprocessing.TimeoutError:
+                legacy = f"> {legacy_timeout:.0f} s"
+                same = "n/a"
+                pool.terminate()
+
+        print(
+            f"{size_mb:6.2f}MB {engine_time * 1000:10.1f} {size_mb / engine_time:7.1f} "
+            f"{legacy:>12} {same:>11}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="Compare lean and full Playwright rendering")
+    render.add_argument("urls", nargs="+")
+
+    extract = subparsers.add_parser("extract", help="Compare extract_clean_text with the scraper's lxml extractor")
+    extract.add_argument("files", nargs="*", help="HTML files (default: synthetic pages)")
+
+    rules = subparsers.add_parser("rules", help="Compare rule_engine with the legacy regex rules")
+    rules.add_argument("--sizes", default="1,2,5,10", help="Comma-separated input sizes in MB")
+    rules.add_argument("--legacy-timeout", type=float, default=10.0, help="Seconds before giving up on the legacy regexes")
+
+    args = parser.parse_args(argv)
+    if args.command == "render":
+        bench_render(args.urls)
+    elif args.command == "extract":
+        bench_extract(args.files)
+    elif args.command == "rules":
+        bench_rules([float(size) for size in args.sizes.split(",")], args.legacy_timeout)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,187 @@
+"""
+Bounded pool of long-lived headless Chromium browsers for the Playwright strategy.
+Each request gets a fresh browser context; browsers are recycled after a number
+of pages or when their processes use too much memory.
+"""
+import os
+import sys
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Pool settings
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+BROWSER_MAX_MEMORY_MB = float(os.getenv("BROWSER_MAX_MEMORY_MB", "768"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "30"))  # seconds
+
+
+class BrowserPoolTimeout(Exception):
+    """Raised when no browser becomes free within BROWSER_ACQUIRE_TIMEOUT."""
+
+
+class _BrowserSlot:
+    """One pool slot; the browser is launched at start and replaced when recycled."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.pages_served = 0
+
+
+class BrowserPool:
+    """
+    A fixed number of browser slots handed out through an asyncio.Queue, so
+    requests queue up when every browser is busy instead of forking new
+    Chromium processes.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_pages: int = BROWSER_MAX_PAGES,
+        max_memory_mb: float = BROWSER_MAX_MEMORY_MB,
+        acquire_timeout: float = BROWSER_ACQUIRE_TIMEOUT,
+        context_options: Optional[dict] = None
+    ):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.acquire_timeout = acquire_timeout
+        self.context_options = context_options or {}
+        self._playwright = None
+        self._slots = None
+        self._all_slots = []
+        self._start_lock = asyncio.Lock()
+        self.loop = None
+
+    async def start(self) -> None:
+        """
+        Start Playwright and launch one browser per slot. A slot whose launch
+        fails is retried when it is first handed out by page().
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise ValueError("Playwright is not installed. Run: python -m playwright install")
+
+        async with self._start_lock:
+            if self._playwright is not None:
+                return
+            self.loop = asyncio.get_running_loop()
+            self._playwright = await async_playwright().start()
+            self._slots = asyncio.Queue()
+            self._all_slots = [_BrowserSlot(i) for i in range(self.size)]
+            results = await asyncio.gather(
+                *(self._launch(slot) for slot in self._all_slots), return_exceptions=True
+            )
+            for slot, result in zip(self._all_slots, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Could not launch pooled browser {slot.index}: {result}")
+                self._slots.put_nowait(slot)
+
+    async def _launch(self, slot: _BrowserSlot) -> None:
+        """Launch a fresh browser into the slot."""
+        slot.browser = await self._playwright.chromium.launch(headless=True)
+        slot.pages_served = 0
+        logger.info(f"Launched pooled browser {slot.index}")
+
+    async def close(self) -> None:
+        """Close every browser and stop Playwright."""
+        for slot in self._all_slots:
+            await self._close_browser(slot)
+        self._all_slots = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Yield a page in a fresh browser context. Waits for a free browser when
+        the pool is saturated and recycles the browser afterwards if needed.
+        """
+        await self.start()
+        try:
+            slot = await asyncio.wait_for(self._slots.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolTimeout(
+                f"No browser available within {self.acquire_timeout}s (pool size {self.size})"
+            )
+
+        try:
+            if slot.browser is None or not slot.browser.is_connected():
+                await self._launch(slot)
+
+            context = await slot.browser.new_context(**self.context_options)
+            try:
+                yield await context.new_page()
+            finally:
+                slot.pages_served += 1
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Could not close browser context: {e}")
+
+            await self._maybe_recycle(slot)
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def _maybe_recycle(self, slot: _BrowserSlot) -> None:
+        """Close the slot's browser after max_pages pages or above max_memory_mb."""
+        reason = None
+        if slot.pages_served >= self.max_pages:
+            reason = f"served {slot.pages_served} pages"
+        else:
+            memory_mb = await self._browser_memory_mb(slot)
+            if memory_mb is not None and memory_mb > self.max_memory_mb:
+                reason = f"using {memory_mb:.0f} MB"
+
+        if reason:
+            logger.info(f"Recycling pooled browser {slot.index}: {reason}")
+            await self._close_browser(slot)
+
+    async def _browser_memory_mb(self, slot: _BrowserSlot) -> Optional[float]:
+        """
+        Resident memory of all processes of the slot's browser, in MB.
+        Process ids come from the Chromium CDP SystemInfo domain; memory is read
+        from /proc, so this returns None on platforms without it.
+        """
+        if not sys.platform.startswith("linux") or slot.browser is None:
+            return None
+
+        try:
+            session = await slot.browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception as e:
+            logger.debug(f"Could not read browser process info: {e}")
+            return None
+
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        total = 0
+        for process in info.get("processInfo", []):
+            try:
+                with open(f"/proc/{process['id']}/statm") as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, ValueError, IndexError, KeyError):
+                continue
+        return total / (1024 * 1024)
+
+    async def _close_browser(self, slot: _BrowserSlot) -> None:
+        if slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception as e:
+                logger.warning(f"Could not close pooled browser {slot.index}: {e}")
+            slot.browser = None
+            slot.pages_served = 0
@@ -1,62 +1,215 @@
 import os
-from openai import OpenAI
+import asyncio
+import hashlib
+from typing import AsyncIterator, List, Optional
 from dotenv import load_dotenv
 
+from document_sessions import DocumentSession
+from llm_gateway import INTERACTIVE, LLMGateway, llm_gateway
+from result_cache import ResultCache, cache_key
+from search_index import normalize_question
+
 load_dotenv()
 
-# Initialize OpenAI client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-client = None
-if openai_api_key:
-    try:
-        client = OpenAI(api_key=openai_api_key)
-    except Exception as e:
-        print(f"Warning: Could not initialize OpenAI client: {e}")
+# Bump whenever the chat prompt or model changes, so cached answers are not reused
+CHAT_PROMPT_VERSION = "1"
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "5000"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "86400"))  # seconds
+
+# OpenAI calls go through the shared gateway, ahead of bulk analysis;
+# None when no API key is configured
+client: Optional[LLMGateway] = llm_gateway if llm_gateway.configured else None
+
+# OpenAI answers by document and normalized question
+chat_cache = ResultCache(max_entries=CHAT_CACHE_MAX_ENTRIES, ttl=CHAT_CACHE_TTL, table="chat_answers")
+
+
+def get_chat_response(
+    question: str,
+    context: str,
+    passages: Optional[List[str]] = None,
+    session: Optional[DocumentSession] = None
+) -> str:
+    """
+    Synchronous wrapper around async_get_chat_response for callers that are
+    not running inside an event loop.
+    """
+    async def _run():
+        try:
+            return await async_get_chat_response(question, context, passages, session)
+        finally:
+            await llm_gateway.close()
+
+    return asyncio.run(_run())
 
 
-def get_chat_response(question: str, context: str) -> str:
+async def async_get_chat_response(
+    question: str,
+    context: str,
+    passages: Optional[List[str]] = None,
+    session: Optional[DocumentSession] = None
+) -> str:
     """
     Generate a response to a question about the Terms and Conditions.
-    Uses OpenAI if available, otherwise returns a simple response.
+    context is the analysis summary; passages are excerpts of the document
+    relevant to the question and session the analyzed document, when it is
+    known (see document_sessions). Uses OpenAI if available, otherwise returns
+    a simple response.
     """
     if client:
-        return get_openai_chat_response(question, context)
+        return await get_openai_chat_response(question, context, passages, session)
     else:
-        return get_simple_chat_response(question, context)
+        return await get_fallback_chat_response(question, context, session)
 
 
-def get_openai_chat_response(question: str, context: str) -> str:
-    """Generate response using OpenAI API."""
-    try:
-        prompt = f"""You are a helpful assistant that answers questions about Terms and Conditions documents.
+def build_chat_prompt(question: str, context: str, passages: Optional[List[str]] = None) -> str:
+    excerpts = ""
+    if passages:
+        numbered = "\n\n".join(f"[{number}] {passage}" for number, passage in enumerate(passages, 1))
+        excerpts = f"""
+Relevant excerpts from the document:
+{numbered}
+"""
+
+    return f"""You are a helpful assistant that answers questions about Terms and Conditions documents.
 
 Context (summary of the analyzed Terms and Conditions):
 {context}
-
+{excerpts}
 User Question: {question}
 
 Provide a clear, concise answer in English based on the context. If the question cannot be answered from the context, say so politely. Always respond in English regardless of the question language.
 """
 
-        response = client.chat.completions.create(
+
+def chat_messages(prompt: str) -> List[dict]:
+    return [
+        {"role": "system", "content": "You are a helpful assistant that answers questions about legal documents. Be clear and concise. Always respond in English regardless of the question language."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def chat_cache_key(question: str, context: str, session: Optional[DocumentSession] = None) -> str:
+    """
+    Cache key from the document (its text hash for a session, otherwise the
+    summary sent as context) and the normalized question, so paraphrases of a
+    question about the same document share an answer.
+    """
+    document = session.document_hash if session else hashlib.sha256(context.encode("utf-8")).hexdigest()
+    return cache_key(normalize_question(question), "chat", f"{CHAT_PROMPT_VERSION}:{document}")
+
+
+async def get_openai_chat_response(
+    question: str,
+    context: str,
+    passages: Optional[List[str]] = None,
+    session: Optional[DocumentSession] = None
+) -> str:
+    """Generate response using OpenAI API (answers are cached, fallbacks are not)."""
+    key = chat_cache_key(question, context, session)
+    cached = await asyncio.to_thread(chat_cache.get, key)
+    if cached is not None:
+        return cached["answer"]
+
+    try:
+        prompt = build_chat_prompt(question, context, passages)
+
+        response = await llm_gateway.complete(
+            "chat",
+            INTERACTIVE,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that answers questions about legal documents. Be clear and concise. Always respond in English regardless of the question language."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=chat_messages(prompt),
             temperature=0.7,
             max_tokens=300
         )
 
-        return response.choices[0].message.content.strip()
+        answer = response.choices[0].message.content.strip()
+
+    except Exception as e:
+        print(f"OpenAI chat failed: {e}, using fallback")
+        return await get_fallback_chat_response(question, context, session)
+
+    await asyncio.to_thread(chat_cache.set, key, {"answer": answer})
+    return answer
+
 
+async def stream_chat_response(
+    question: str,
+    context: str,
+    passages: Optional[List[str]] = None,
+    session: Optional[DocumentSession] = None
+) -> AsyncIterator[str]:
+    """
+    Like async_get_chat_response, but yields the answer in pieces as OpenAI generates
+    it. Closing the generator early (e.g. the client disconnected) closes the
+    OpenAI stream, so no more tokens are generated. Cached and fallback answers
+    come in one piece.
+    """
+    if not client:
+        yield await get_fallback_chat_response(question, context, session)
+        return
+
+    key = chat_cache_key(question, context, session)
+    cached = await asyncio.to_thread(chat_cache.get, key)
+    if cached is not None:
+        yield cached["answer"]
+        return
+
+    stream = llm_gateway.stream(
+        "chat_stream",
+        INTERACTIVE,
+        model="gpt-3.5-turbo",
+        messages=chat_messages(build_chat_prompt(question, context, passages)),
+        temperature=0.7,
+        max_tokens=300
+    )
+    pieces = []
+    try:
+        async for piece in stream:
+            # No leading whitespace, like the non-streaming answer
+            if not pieces:
+                piece = piece.lstrip()
+            if piece:
+                pieces.append(piece)
+                yield piece
     except Exception as e:
+        if pieces:
+            raise
         print(f"OpenAI chat failed: {e}, using fallback")
-        return get_simple_chat_response(question, context)
+        yield await get_fallback_chat_response(question, context, session)
+        return
+    finally:
+        await stream.aclose()
 
+    await asyncio.to_thread(chat_cache.set, key, {"answer": "".join(pieces).strip()})
+
+
+async def get_fallback_chat_response(
+    question: str,
+    context: str,
+    session: Optional[DocumentSession] = None
+) -> str:
+    """
+    get_simple_chat_response quoting the session's best-matching sentences.
+    Only this offline path needs them, so the sentence index is built here
+    (on the session's first offline answer), off the event loop.
+    """
+    clauses = await asyncio.to_thread(session.matching_clauses, question) if session else None
+    return get_simple_chat_response(question, context, clauses)
+
+
+def get_simple_chat_response(question: str, context: str, clauses: Optional[List[dict]] = None) -> str:
+    """
+    Simple response when OpenAI is not available: the clauses of the document
+    that best match the question, quoted with their character offsets, or a
+    keyword-based hint when there are none.
+    """
+    if clauses:
+        quotes = "\n".join(
+            f"- \"{clause['text']}\" (characters {clause['start']}-{clause['end']})" for clause in clauses
+        )
+        return f"These parts of the document best match your question:\n{quotes}"
 
-def get_simple_chat_response(question: str, context: str) -> str:
-    """Simple rule-based response when OpenAI is not available."""
     question_lower = question.lower()
 
     # Simple keyword matching
@@ -0,0 +1,423 @@
+"""
+Incremental clause-level analysis for documents that are analyzed repeatedly,
+such as the Terms & Conditions page behind a URL.
+
+The document is split into clauses and every clause gets a verdict cached by
+the clause's content hash, so when a service updates a few paragraphs only the
+new or modified clauses go to the rule engine or OpenAI. With OpenAI, one more
+call turns the clause verdicts into the document's summary, risk score and
+alerts; the document result is cached like any other analysis. The clause
+hashes of each document are remembered so the response can list the clauses
+that changed since the previous version.
+"""
+import os
+import asyncio
+import difflib
+import hashlib
+import secrets
+from typing import Dict, List, Optional, Tuple
+
+import analyzer
+from analyzer import (
+    ANALYSIS_CHUNK_CHARS,
+    ANALYSIS_DEADLINE,
+    ANALYSIS_MAX_CHUNKS,
+    PROMPT_VERSION,
+    RISK_LEVELS,
+    already_done,
+    analysis_flights,
+    analyze_with_rules,
+    get_openai_semaphore,
+    merge_chunk_results,
+    normalize_analysis,
+    parse_json_response,
+    race_openai_analysis,
+    result_cache,
+    run_rules,
+    select_chunks,
+    settled_by_rules,
+    summarize_rule_matches,
+    tiered_analysis,
+)
+from result_cache import ResultCache, cache_key, normalize_text
+from llm_gateway import BULK, llm_gateway
+from rule_engine import match_rule_names, rule_engine
+from script_detector import is_likely_non_english
+from text_chunks import split_clauses
+
+CLAUSE_MAX_CHARS = int(os.getenv("CLAUSE_MAX_CHARS", "1500"))
+CLAUSE_CACHE_MAX_ENTRIES = int(os.getenv("CLAUSE_CACHE_MAX_ENTRIES", "20000"))
+DOCUMENT_VERSION_TTL = float(os.getenv("DOCUMENT_VERSION_TTL", str(30 * 86400)))  # seconds
+# Clauses per OpenAI request (each request also stays within ANALYSIS_CHUNK_CHARS)
+CLAUSES_PER_REQUEST = 10
+# Completion tokens reserved per clause verdict, plus a margin for the JSON around them
+CLAUSE_VERDICT_TOKENS = 150
+CLAUSE_RESPONSE_MARGIN_TOKENS = 100
+CHANGED_CLAUSE_PREVIEW_CHARS = 300
+MAX_CHANGED_CLAUSES = 50
+
+# Verdict per clause: {"rules": [...]} in rule mode, summary/risk_score/alerts with OpenAI
+clause_cache = ResultCache(max_entries=CLAUSE_CACHE_MAX_ENTRIES, table="clauses")
+# Version histories are kept per document key: "url:<normalized URL>" for pages, or
+# "text:<document_id>" for pasted text under an id from new_text_document_id,
+# so a client can neither pick a URL's history nor guess another client's text.
+# key -> {"text_hash", "clauses": [[hash, preview], ...], "previous": older clauses}
+document_versions = ResultCache(ttl=DOCUMENT_VERSION_TTL, table="documents")
+
+
+async def async_analyze_document(
+    document_id: str,
+    text: str,
+    deadline: Optional[float] = ANALYSIS_DEADLINE,
+    rules: Optional[Dict[str, any]] = None
+) -> Dict[str, any]:
+    """
+    Analyze a version of the document identified by document_id (a key from
+    url_document_key or text_document_key). Returns the usual summary / risk_score / alerts plus
+    "changed_clauses": the clauses added, modified or removed since the
+    previous version, or None for a document seen for the first time.
+    rules is the document's rule-based result (see analyze_document_with_rules)
+    if the caller already has it, so it is not computed again.
+    """
+    clauses = split_clauses(text, CLAUSE_MAX_CHARS) or [text.strip()]
+    text_hash = clause_hash(text)
+
+    if analyzer.client and tiered_analysis():
+        key = cache_key(text, "tiered-document", f"{PROMPT_VERSION}:{rule_engine.version}")
+    elif analyzer.client:
+        key = cache_key(text, "openai-document", PROMPT_VERSION)
+    else:
+        key = cache_key(text, "rules-document", rule_engine.version)
+
+    result = await asyncio.to_thread(result_cache.get, key)
+    if result is None:
+        result = await analysis_flights.run(
+            ("document", key), lambda: analyze_document_uncached(text, clauses, key, deadline, rules)
+        )
+
+    # The result may be shared with other requests in the same flight: copy it
+    changed_clauses = await asyncio.to_thread(record_document_version, document_id, text_hash, clauses)
+    return dict(result, changed_clauses=changed_clauses)
+
+
+async def analyze_document_uncached(
+    text: str,
+    clauses: List[str],
+    key: str,
+    deadline: Optional[float],
+    rules: Optional[Dict[str, any]] = None
+) -> Dict[str, any]:
+    if analyzer.client and tiered_analysis():
+        if rules is None:
+            rules = await analyze_clauses_with_rules(text, clauses)
+        if settled_by_rules(rules):
+            await asyncio.to_thread(result_cache.set, key, rules)
+            return rules
+        return await race_openai_analysis(
+            ("openai-document", key),
+            lambda: analyze_clauses_with_openai(clauses, key),
+            lambda: already_done(rules),
+            deadline
+        )
+
+    if analyzer.client:
+        return await race_openai_analysis(
+            ("openai-document", key),
+            lambda: analyze_clauses_with_openai(clauses, key),
+            lambda: already_done(rules) if rules is not None else analyze_clauses_with_rules(text, clauses),
+            deadline
+        )
+
+    result = rules if rules is not None else await analyze_clauses_with_rules(text, clauses)
+    await asyncio.to_thread(result_cache.set, key, result)
+    return result
+
+
+async def analyze_document_with_rules(text: str) -> Dict[str, any]:
+    """The rule-based result async_analyze_document uses for text (clause verdicts are cached)."""
+    return await analyze_clauses_with_rules(text, split_clauses(text, CLAUSE_MAX_CHARS) or [text.strip()])
+
+
+def url_document_key(url: str) -> str:
+    """Version-history key of a page, by its normalized URL."""
+    return "url:" + url
+
+
+def text_document_key(document_id: str) -> str:
+    """Version-history key of pasted text tracked under a server-issued document_id."""
+    return "text:" + document_id
+
+
+def new_text_document_id() -> str:
+    """A new, unguessable document_id for pasted text."""
+    return secrets.token_hex(16)
+
+
+def document_known(document_id: str) -> bool:
+    """True if the document has a recorded version that has not expired."""
+    return document_versions.get(cache_key(document_id, "document", "")) is not None
+
+
+def clause_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def record_document_version(document_id: str, text_hash: str, clauses: List[str]) -> Optional[List[dict]]:
+    """
+    Store this version of the document and return its changes against the
+    previous version. Re-analyzing an unchanged document reports the changes
+    of its latest update again.
+    """
+    key = cache_key(document_id, "document", "")
+    current = [[clause_hash(clause), clause[:CHANGED_CLAUSE_PREVIEW_CHARS]] for clause in clauses]
+    stored = document_versions.get(key)
+
+    if stored is None:
+        document_versions.set(key, {"text_hash": text_hash, "clauses": current, "previous": None})
+        return None
+    if stored["text_hash"] == text_hash:
+        previous = stored["previous"]
+    else:
+        previous = stored["clauses"]
+        document_versions.set(key, {"text_hash": text_hash, "clauses": current, "previous": previous})
+    if previous is None:
+        return None
+    return diff_clauses(previous, current)
+
+
+def diff_clauses(previous: List[list], current: List[list]) -> List[dict]:
+    """Added, modified and removed clauses between two [hash, preview] lists."""
+    changes = []
+    matcher = difflib.SequenceMatcher(
+        a=[clause[0] for clause in previous],
+        b=[clause[0] for clause in current],
+        autojunk=False
+    )
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        modified = min(old_end - old_start, new_end - new_start) if tag == "replace" else 0
+        for index in range(new_start, new_end):
+            status = "modified" if index - new_start < modified else "added"
+            changes.append({"status": status, "text": current[index][1]})
+        for index in range(old_start + modified, old_end):
+            changes.append({"status": "removed", "text": previous[index][1]})
+    return changes[:MAX_CHANGED_CLAUSES]
+
+
+async def analyze_clauses_with_rules(text: str, clauses: List[str]) -> Dict[str, any]:
+    """Rule-based analysis from per-clause rule matches; only uncached clauses are scanned."""
+    if await asyncio.to_thread(is_likely_non_english, text):
+        return await run_rules(analyze_with_rules, text)
+
+    keys = [cache_key(clause, "rules-clause", rule_engine.version) for clause in clauses]
+    verdicts = await asyncio.to_thread(clause_cache.get_many, keys)
+    missing = [index for index, key in enumerate(keys) if key not in verdicts]
+    matches = await run_rules(match_rule_names, [clauses[index] for index in missing])
+    new_verdicts = {keys[index]: {"rules": names} for index, names in zip(missing, matches)}
+    if new_verdicts:
+        await asyncio.to_thread(clause_cache.set_many, new_verdicts)
+        verdicts.update(new_verdicts)
+
+    matched = {name for verdict in verdicts.values() for name in verdict["rules"]}
+    return summarize_rule_matches([rule for rule in rule_engine.rules if rule.name in matched])
+
+
+async def analyze_clauses_with_openai(clauses: List[str], key: str) -> Dict[str, any]:
+    """
+    Document result from the clause verdicts: one OpenAI call summarizes them
+    (merge_chunk_results combines them if that call fails). Cached under key
+    unless some clauses fell back to rules, so the next analysis retries them.
+    """
+    verdicts, complete = await clause_verdicts_with_openai(clauses)
+    try:
+        result = await request_document_verdict(verdicts)
+    except Exception as e:
+        print(f"OpenAI document summary failed: {e}, combining the clause verdicts")
+        result = merge_chunk_results(verdicts)
+        complete = False
+    if complete:
+        await asyncio.to_thread(result_cache.set, key, result)
+    return result
+
+
+async def clause_verdicts_with_openai(clauses: List[str]) -> Tuple[List[Tuple[Dict[str, any], bool]], bool]:
+    """
+    (verdict, from_openai) for every clause, asking OpenAI only about uncached
+    clauses (in batches, under the analyzer's concurrency cap; beyond
+    ANALYSIS_MAX_CHUNKS batches, the least risky ones get rules only). Clauses
+    whose batch failed get rule-based verdicts that are not cached. Also
+    returns whether no batch failed. Raises if every OpenAI request failed.
+    """
+    keys = [cache_key(clause, "openai-clause", PROMPT_VERSION) for clause in clauses]
+    verdicts = await asyncio.to_thread(clause_cache.get_many, keys)
+    missing = [index for index, key in enumerate(keys) if key not in verdicts]
+
+    batches = []
+    length = 0
+    for index in missing:
+        if not batches or len(batches[-1]) >= CLAUSES_PER_REQUEST or length + len(clauses[index]) > ANALYSIS_CHUNK_CHARS:
+            batches.append([])
+            length = 0
+        batches[-1].append(index)
+        length += len(clauses[index])
+
+    selected = select_chunks([" ".join(clauses[index] for index in batch) for batch in batches], ANALYSIS_MAX_CHUNKS)
+    semaphore = get_openai_semaphore()
+
+    async def request_batch(batch: List[int]) -> List[Optional[Dict[str, any]]]:
+        try:
+            async with semaphore:
+                return await request_clause_verdicts([clauses[index] for index in batch])
+        except TruncatedResponse:
+            if len(batch) == 1:
+                raise
+            # Ask again in halves rather than failing the same batch on every analysis
+            middle = len(batch) // 2
+            halves = await asyncio.gather(request_batch(batch[:middle]), request_batch(batch[middle:]))
+            return halves[0] + halves[1]
+
+    async def analyze_batch(number: int, batch: List[int]):
+        if number not in selected:
+            return [None] * len(batch)
+        try:
+            return await request_batch(batch)
+        except Exception as e:
+            return e
+
+    outcomes = await asyncio.gather(*(analyze_batch(number, batch) for number, batch in enumerate(batches)))
+    errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    if selected and len(errors) == len(selected):
+        raise errors[0]
+
+    new_verdicts = {}
+    fallbacks = {}
+    for batch, outcome in zip(batches, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"OpenAI clause analysis failed: {outcome}, using rule-based analysis")
+            outcome = [None] * len(batch)
+        for index, verdict in zip(batch, outcome):
+            if verdict is not None:
+                new_verdicts[keys[index]] = verdict
+            else:
+                fallbacks[index] = await run_rules(analyze_with_rules, clauses[index])
+    if new_verdicts:
+        await asyncio.to_thread(clause_cache.set_many, new_verdicts)
+        verdicts.update(new_verdicts)
+
+    return [
+        (fallbacks[index], False) if index in fallbacks else (verdicts[key], True)
+        for index, key in enumerate(keys)
+    ], not errors
+
+
+class TruncatedResponse(ValueError):
+    """The model stopped at max_tokens, so its JSON answer is incomplete."""
+
+
+async def request_clause_verdicts(clauses: List[str]) -> List[Optional[Dict[str, any]]]:
+    """
+    One OpenAI request for several clauses. Returns one verdict per clause,
+    in clause order, or None for a clause the model left out. Raises
+    TruncatedResponse if the answer did not fit in the completion budget.
+    """
+    numbered = "\n".join(f"[{number}] {clause}" for number, clause in enumerate(clauses, 1))
+
+    prompt = f"""Analyze each numbered clause of the following Terms and Conditions and provide for every clause:
+1. A one-sentence summary IN ENGLISH
+2. A risk score: Low, Medium, or High
+3. A list of alerts for concerning terms IN ENGLISH (empty if there are none)
+
+IMPORTANT: Summarize in English regardless of the original language of the text.
+
+Focus on detecting:
+- Payment clauses and hidden fees
+- Auto-renewal subscriptions
+- Data collection practices
+- Third-party data sharing
+- Risky legal clauses (arbitration, liability waivers, etc.)
+
+Clauses to analyze (may be in any language):
+{numbered}
+
+Respond in this exact JSON format with one entry per clause (all text must be in English):
+{{
+  "clauses": [
+    {{"id": 1, "summary": "One sentence in English", "risk_score": "Low|Medium|High", "alerts": ["Alert in English"]}}
+  ]
+}}
+"""
+
+    response = await llm_gateway.complete(
+        "clauses",
+        BULK,
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a legal analysis assistant. Always respond with valid JSON only. Always provide summaries and alerts in English, regardless of the input language."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=CLAUSE_VERDICT_TOKENS * len(clauses) + CLAUSE_RESPONSE_MARGIN_TOKENS
+    )
+    if response.choices[0].finish_reason == "length":
+        raise TruncatedResponse(f"Verdicts for {len(clauses)} clauses exceeded the completion budget")
+
+    answers = {}
+    for entry in parse_json_response(response.choices[0].message.content).get("clauses", []):
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+            answers[entry["id"]] = normalize_analysis(entry)
+
+    return [answers.get(number) for number in range(1, len(clauses) + 1)]
+
+
+async def request_document_verdict(verdicts: List[Tuple[Dict[str, any], bool]]) -> Dict[str, any]:
+    """
+    One OpenAI call that turns the clause verdicts into the document's summary,
+    risk score and alerts. Verdicts beyond ANALYSIS_CHUNK_CHARS are left out,
+    the least risky first. Raises on API or parsing errors.
+    """
+    lines = []
+    for number, (verdict, from_openai) in enumerate(verdicts, 1):
+        alerts = "; ".join(verdict["alerts"]) if verdict["alerts"] else "none"
+        summary = verdict["summary"] if from_openai else "(rule-based check)"
+        line = f"[{number}] {verdict['risk_score']}: {summary} Alerts: {alerts}"
+        lines.append((RISK_LEVELS.index(verdict["risk_score"]), number, line))
+
+    kept = []
+    length = 0
+    for line in sorted(lines, key=lambda line: (-line[0], line[1])):
+        if kept and length + len(line[2]) > ANALYSIS_CHUNK_CHARS:
+            break
+        kept.append(line)
+        length += len(line[2]) + 1
+    numbered = "\n".join(line[2] for line in sorted(kept, key=lambda line: line[1]))
+
+    prompt = f"""The following are per-clause verdicts for a Terms and Conditions document, in document order. Based on them, provide for the whole document:
+1. A simplified summary (2-3 sentences) IN ENGLISH
+2. An overall risk score: Low, Medium, or High
+3. A list of alerts (bullet points) for the most concerning clauses IN ENGLISH
+
+Clause verdicts:
+{numbered}
+
+Respond in this exact JSON format (all text must be in English):
+{{
+  "summary": "Brief summary here in English",
+  "risk_score": "Low|Medium|High",
+  "alerts": ["Alert 1 in English", "Alert 2 in English", "Alert 3 in English"]
+}}
+"""
+
+    response = await llm_gateway.complete(
+        "document",
+        BULK,
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a legal analysis assistant. Always respond with valid JSON only. Always provide summaries and alerts in English."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=1000
+    )
+
+    return normalize_analysis(parse_json_response(response.choices[0].message.content))
@@ -0,0 +1,245 @@
+"""
+Single-pass main-text extraction for Terms & Conditions pages.
+
+DensityExtractionTarget consumes parse events, so text is extracted while the
+HTML is still being parsed: StreamingTextExtractor can be fed the response body
+chunk by chunk as it is downloaded.
+"""
+import re
+from typing import Optional
+
+from bs4 import CData, NavigableString, Tag
+from lxml import etree
+
+# Subtrees that never contain the legal text
+SKIP_TAGS = frozenset([
+    "script", "style", "nav", "header", "footer", "aside",
+    "noscript", "meta", "link", "iframe", "svg", "img"
+])
+
+# Cookie banners and popups (common class/id patterns)
+BOILERPLATE_PATTERN = re.compile(r"cookie|banner|popup|modal|overlay", re.I)
+
+# Minimum length for a content container to be preferred over the whole body
+MIN_CONTENT_CHARS = 500
+
+# Elements whose text counts as a paragraph, and elements that may hold the main content
+PARAGRAPH_TAGS = frozenset([
+    "p", "li", "td", "pre", "blockquote", "dd", "dt",
+    "h1", "h2", "h3", "h4", "h5", "h6"
+])
+CONTAINER_TAGS = frozenset([
+    "div", "section", "article", "main", "body", "td", "ul", "ol", "table", "form"
+])
+MIN_PARAGRAPH_CHARS = 25
+CONTENT_HINT_BONUS = 25
+
+
+def _class_tokens(attrib) -> list:
+    return attrib.get("class", "").split()
+
+
+# Elements that usually hold the legal text, as predicates over (tag, attrib):
+# main, article, [role="main"], .content, #content, .main-content, #main-content,
+# div[class*="terms"], div[class*="condition"], div[id*="terms"], div[id*="condition"],
+# .terms-content, #terms-content
+CONTENT_SELECTORS = [
+    lambda tag, attrib: tag == "main",
+    lambda tag, attrib: tag == "article",
+    lambda tag, attrib: attrib.get("role") == "main",
+    lambda tag, attrib: "content" in _class_tokens(attrib),
+    lambda tag, attrib: attrib.get("id") == "content",
+    lambda tag, attrib: "main-content" in _class_tokens(attrib),
+    lambda tag, attrib: attrib.get("id") == "main-content",
+    lambda tag, attrib: tag == "div" and "terms" in attrib.get("class", ""),
+    lambda tag, attrib: tag == "div" and "condition" in attrib.get("class", ""),
+    lambda tag, attrib: tag == "div" and "terms" in attrib.get("id", ""),
+    lambda tag, attrib: tag == "div" and "condition" in attrib.get("id", ""),
+    lambda tag, attrib: "terms-content" in _class_tokens(attrib),
+    lambda tag, attrib: attrib.get("id") == "terms-content",
+]
+
+
+class DensityExtractionTarget:
+    """
+    Single-pass main-content extractor working on parse events.
+
+    Boilerplate subtrees are dropped as they are opened. Every paragraph-like
+    element with at least MIN_PARAGRAPH_CHARS characters adds a score of
+    1 + commas + min(chars / 100, 3) to its parent and half of that to its
+    grandparent. When a container closes, its score is boosted if it matches a
+    content selector and scaled by (1 - link density); the best-scoring
+    container wins. Falls back to the whole body if the winner has
+    MIN_CONTENT_CHARS characters or fewer.
+
+    The same target is driven by lxml (parse_main_text, StreamingTextExtractor)
+    or by a walk over an existing BeautifulSoup tree (extract_main_text).
+    """
+
+    def __init__(self):
+        self._pieces = []
+        self._length = 0
+        self._link_length = 0
+        self._commas = 0
+        self._anchor_depth = 0
+        self._skip_depth = 0
+        # Open elements, see start()
+        self._stack = []
+        self._best_score = 0.0
+        self._best = None
+        self._body = None
+
+    def start(self, tag, attrib):
+        if not isinstance(tag, str):
+            tag = ""
+        if self._skip_depth > 0 or tag in SKIP_TAGS or (
+            tag not in ("html", "body") and (
+                BOILERPLATE_PATTERN.search(attrib.get("class", ""))
+                or BOILERPLATE_PATTERN.search(attrib.get("id", ""))
+            )
+        ):
+            self._skip_depth += 1
+            self._stack.append(None)
+            return
+
+        if tag == "a":
+            self._anchor_depth += 1
+        hinted = any(matches(tag, attrib) for matches in CONTENT_SELECTORS)
+        # [tag, hinted, start piece, start length, start link length, start commas, score]
+        self._stack.append([
+            tag, hinted, len(self._pieces), self._length, self._link_length, self._commas, 0.0
+        ])
+
+    def end(self, tag):
+        if not self._stack:
+            return
+        element = self._stack.pop()
+        if element is None:
+            self._skip_depth -= 1
+            return
+
+        tag, hinted, start_piece, start_length, start_link_length, start_commas, score = element
+        if tag == "a":
+            self._anchor_depth -= 1
+
+        length = self._length - start_length
+        span = (start_piece, len(self._pieces))
+        if tag == "body":
+            self._body = span
+
+        if tag in PARAGRAPH_TAGS and length >= MIN_PARAGRAPH_CHARS:
+            paragraph_score = 1 + (self._commas - start_commas) + min(length / 100, 3)
+            if self._stack and self._stack[-1] is not None:
+                self._stack[-1][6] += paragraph_score
+            if len(self._stack) > 1 and self._stack[-2] is not None:
+                self._stack[-2][6] += paragraph_score / 2
+
+        if score > 0 and (tag in CONTAINER_TAGS or hinted):
+            if hinted:
+                score += CONTENT_HINT_BONUS
+            link_density = (self._link_length - start_link_length) / length if length else 1.0
+            score *= 1 - link_density
+            if score > self._best_score:
+                self._best_score = score
+                self._best = (length, span)
+
+    def data(self, data):
+        if self._skip_depth == 0:
+            self._pieces.append(data)
+            self._length += len(data)
+            self._commas += data.count(",")
+            if self._anchor_depth:
+                self._link_length += len(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self) -> str:
+        # Elements left open by a truncated document still count
+        while self._stack:
+            self.end(None)
+
+        if self._best is not None and self._best[0] > MIN_CONTENT_CHARS:
+            return self._text(self._best[1])
+        if self._body is not None:
+            return self._text(self._body)
+        if self._best is not None:
+            return self._text(self._best[1])
+        return ""
+
+    def _text(self, span) -> str:
+        start, end = span
+        return "".join(self._pieces[start:end])
+
+
+def parse_main_text(html) -> str:
+    """Parse raw HTML (bytes or str) with lxml and return the raw main text."""
+    if isinstance(html, str):
+        extractor = StreamingTextExtractor("utf-8")
+        extractor.feed(html.encode("utf-8"))
+    else:
+        extractor = StreamingTextExtractor()
+        extractor.feed(html)
+    return extractor.close()
+
+
+def extract_main_text(soup) -> str:
+    """
+    Raw main text of an already-parsed BeautifulSoup document, computed in
+    one walk over the tree.
+    """
+    target = DensityExtractionTarget()
+    # Explicit stack instead of recursion: (tag, iterator over its children)
+    stack = [(None, iter(soup.contents))]
+    while stack:
+        tag, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if tag is not None:
+                target.end(tag.name)
+            continue
+        if isinstance(child, Tag):
+            attrib = {
+                key: " ".join(value) if isinstance(value, list) else value
+                for key, value in child.attrs.items()
+            }
+            target.start(child.name, attrib)
+            stack.append((child, iter(child.contents)))
+        elif type(child) in (NavigableString, CData):
+            target.data(str(child))
+    return target.close()
+
+
+class StreamingTextExtractor:
+    """Feed HTML bytes as they arrive; close() returns the raw extracted text."""
+
+    def __init__(self, encoding: Optional[str] = None):
+        self._target = DensityExtractionTarget()
+        try:
+            self._parser = self._make_parser(encoding)
+        except LookupError:
+            # Unknown charset in the Content-Type header, let libxml2 detect it
+            self._parser = self._make_parser(None)
+        self._fed = False
+
+    def _make_parser(self, encoding: Optional[str]):
+        return etree.HTMLParser(
+            target=self._target,
+            encoding=encoding,
+            recover=True,
+            no_network=True
+        )
+
+    def feed(self, chunk: bytes) -> None:
+        if chunk:
+            self._parser.feed(chunk)
+            self._fed = True
+
+    def close(self) -> str:
+        if not self._fed:
+            return ""
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            return self._target.close()
@@ -0,0 +1,117 @@
+"""
+Server-side document sessions for /chat.
+
+/analyze registers the analyzed document: its full text, the analysis summary
+and a BM25 index over clause-sized passages, under a session id returned to
+the client. /chat then sends only the session id and the question, and the
+prompt gets the passages most relevant to the question instead of the whole
+summary being sent back and forth.
+
+Sessions live in this process's memory (least recently used sessions are
+dropped beyond SESSION_MAX_ENTRIES, and all of them after SESSION_TTL).
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from result_cache import cache_key
+from search_index import BM25Index, SentenceIndex
+from text_chunks import split_clauses
+
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "200"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "86400"))  # seconds
+SESSION_PASSAGE_CHARS = int(os.getenv("SESSION_PASSAGE_CHARS", "1000"))
+# Passages retrieved for each chat question
+CHAT_TOP_K = int(os.getenv("CHAT_TOP_K", "4"))
+# Sentences quoted by the offline chat answer (no OpenAI)
+CHAT_FALLBACK_CLAUSES = int(os.getenv("CHAT_FALLBACK_CLAUSES", "3"))
+
+
+class DocumentSession:
+    def __init__(self, session_id: str, text: str, summary: str):
+        self.session_id = session_id
+        self.text = text
+        self.summary = summary
+        # Identifies the document's text, e.g. for cached chat answers
+        self.document_hash = cache_key(text, "document", "")
+        self.index = BM25Index(split_clauses(text, SESSION_PASSAGE_CHARS) or [text.strip()])
+        # Sentence index for offline answers, built for the first one
+        self._sentences = None
+        self._sentences_lock = threading.Lock()
+
+    def relevant_passages(self, question: str, k: int = CHAT_TOP_K) -> List[str]:
+        """The k passages that best match the question, in document order."""
+        hits = sorted(index for index, _ in self.index.search(question, k))
+        return [self.index.passages[index] for index in hits]
+
+    def matching_clauses(self, question: str, k: int = CHAT_FALLBACK_CLAUSES) -> List[dict]:
+        """The k sentences that best match the question, with their character offsets in the text."""
+        with self._sentences_lock:
+            if self._sentences is None:
+                self._sentences = SentenceIndex(self.text)
+        return self._sentences.search(question, k)
+
+
+class DocumentSessionStore:
+    """In-memory LRU of sessions with a TTL; safe to use from worker threads."""
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES, ttl: float = SESSION_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # session id -> (last used timestamp, DocumentSession)
+        self._sessions = OrderedDict()
+        self.stats = {"registered": 0, "reused": 0, "evicted": 0, "expired": 0}
+
+    def register(self, text: str, summary: str, provisional: bool = False) -> str:
+        """
+        Session id for the document, indexing it if it has no live session. The id
+        is derived from the text, so analyzing the same document again (from any
+        client) reuses its session and index. A provisional summary (rules only,
+        OpenAI missed the deadline) does not replace the summary of a live session.
+        """
+        session_id = cache_key(text, "session", "")[:32]
+        with self._lock:
+            session = self._lookup(session_id, time.time())
+            if session is not None:
+                if not provisional:
+                    # e.g. the full OpenAI summary replacing a provisional one
+                    session.summary = summary
+                self.stats["reused"] += 1
+                return session_id
+
+        # Build the index outside the lock; a concurrent registration just wins the race
+        session = DocumentSession(session_id, text, summary)
+        with self._lock:
+            self._sessions[session_id] = (time.time(), session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+                self.stats["evicted"] += 1
+            self.stats["registered"] += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[DocumentSession]:
+        with self._lock:
+            return self._lookup(session_id, time.time())
+
+    def _lookup(self, session_id: str, now: float) -> Optional[DocumentSession]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if now - entry[0] > self.ttl:
+            del self._sessions[session_id]
+            self.stats["expired"] += 1
+            return None
+        self._sessions[session_id] = (now, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    def report(self) -> dict:
+        with self._lock:
+            return dict(self.stats, sessions=len(self._sessions))
+
+
+document_sessions = DocumentSessionStore()
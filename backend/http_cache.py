@@ -0,0 +1,167 @@
+"""
+On-disk conditional-GET cache for scraped pages.
+
+Stores the extracted text of a page together with its ETag / Last-Modified so
+the next fetch can revalidate with If-None-Match / If-Modified-Since and skip
+HTML parsing on a 304. Text blobs are content-addressed (sha256), so URLs with
+identical text share one file, and the cache is capped in size with LRU eviction.
+Entries remember the extractor version that produced their text; entries from
+another version are misses, so a changed extractor is not bypassed by 304s.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = os.getenv(
+    "HTTP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+
+class HTTPCache:
+    """
+    index.json maps URL -> {hash, etag, last_modified, size, last_access, extractor};
+    objects/<hh>/<hash>.txt holds the text. Safe to use from worker threads.
+    """
+
+    def __init__(
+        self,
+        directory: str = HTTP_CACHE_DIR,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        extractor_version: str = ""
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extractor_version = extractor_version
+        self._lock = threading.Lock()
+        self._index = None
+        self.stats = {"revalidated": 0, "stored": 0, "evicted": 0}
+
+    def get(self, url: str) -> Optional[dict]:
+        """Return {"text", "etag", "last_modified"} for url, or None if not cached."""
+        with self._lock:
+            entry = self._load_index().get(url)
+            if entry is None or entry.get("extractor", "") != self.extractor_version:
+                return None
+            try:
+                with open(self._blob_path(entry["hash"]), encoding="utf-8") as f:
+                    text = f.read()
+            except OSError:
+                # Blob vanished underneath us; forget the entry
+                self._index.pop(url, None)
+                return None
+            return {"text": text, "etag": entry.get("etag"), "last_modified": entry.get("last_modified")}
+
+    @staticmethod
+    def conditional_headers(cached: Optional[dict]) -> dict:
+        """If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def touch(self, url: str) -> None:
+        """Mark url as used after a 304 so it stays at the hot end of the LRU."""
+        with self._lock:
+            entry = self._load_index().get(url)
+            if entry is not None:
+                entry["last_access"] = time.time()
+                self.stats["revalidated"] += 1
+                self._save_index()
+
+    def store(self, url: str, text: str, response_headers: Mapping[str, str]) -> None:
+        """Cache text for url if the response carries a validator."""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            index = self._load_index()
+            path = self._blob_path(digest)
+            try:
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write HTTP cache entry: {e}")
+                return
+
+            old = index.get(url)
+            index[url] = {
+                "hash": digest,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(data),
+                "last_access": time.time(),
+                "extractor": self.extractor_version,
+            }
+            if old is not None and old["hash"] != digest:
+                self._delete_blob_if_unused(old["hash"])
+            self.stats["stored"] += 1
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        """Drop least recently used URLs until unique blob bytes fit max_bytes."""
+        blob_sizes = {entry["hash"]: entry["size"] for entry in self._index.values()}
+        total = sum(blob_sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            del self._index[url]
+            self.stats["evicted"] += 1
+            if self._delete_blob_if_unused(entry["hash"]):
+                total -= entry["size"]
+
+    def _delete_blob_if_unused(self, digest: str) -> bool:
+        if any(entry["hash"] == digest for entry in self._index.values()):
+            return False
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        return True
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.txt")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(self._index_path(), encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._index_path()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self._index_path())
+        except OSError as e:
+            logger.warning(f"Could not save HTTP cache index: {e}")
@@ -0,0 +1,334 @@
+"""
+Shared gateway for every OpenAI call (document analysis and chat).
+
+One AsyncOpenAI client per event loop, one limit on concurrent calls, and
+token buckets for requests and tokens per minute, so bursts of /analyze
+traffic queue here instead of running into the upstream rate limits.
+Waiting callers are served by priority (INTERACTIVE chat before BULK
+analysis), then in arrival order. Rate-limit (429), server (5xx) and
+connection errors are retried with jittered exponential backoff. Latency,
+queueing and token counts are recorded per caller for /metrics.
+"""
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+
+import openai
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # seconds
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))  # seconds
+
+# Priorities: lower is served first
+INTERACTIVE = 0
+BULK = 1
+
+# Rough prompt size in tokens before the API reports the real usage
+CHARS_PER_TOKEN = 4
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+
+class TokenBucket:
+    """
+    Refills at rate_per_minute, holding at most one minute's worth. The level
+    may go negative when a call turns out to use more than was reserved.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.level = rate_per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is now); call refill first."""
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class _LoopState:
+    """Client, waiting queue and running calls of one event loop."""
+
+    def __init__(self, api_key: str):
+        self.loop = asyncio.get_running_loop()
+        # Retries are handled by the gateway, with the rate limits in mind
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        # (priority, arrival number, tokens, future) of callers waiting for a slot
+        self.waiting = []
+        self.in_flight = 0
+        self.timer = None
+
+
+class LLMGateway:
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self.requests = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(LLM_TOKENS_PER_MINUTE)
+        # The buckets are shared by every event loop
+        self._bucket_lock = threading.Lock()
+        # Event loop -> its client and queue: the server's loop, plus the loop of
+        # any synchronous wrapper's asyncio.run until it calls close()
+        self._states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._arrivals = itertools.count()
+        # caller -> counters
+        self.stats: Dict[str, dict] = {}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def complete(self, caller: str, priority: int, messages: List[dict], max_tokens: int, **kwargs):
+        """
+        chat.completions.create through the limits, retrying transient errors.
+        caller names the use (e.g. "analysis", "chat") in the metrics.
+        """
+        estimate = estimate_tokens(messages, max_tokens)
+        started = time.monotonic()
+        for attempt in itertools.count():
+            state = await self._acquire(caller, priority, estimate)
+            try:
+                response = await state.client.chat.completions.create(
+                    messages=messages, max_tokens=max_tokens, **kwargs
+                )
+            except RETRYABLE_ERRORS as e:
+                self._release(state)
+                if attempt >= LLM_MAX_RETRIES:
+                    self._record_failure(caller, started)
+                    raise
+                await self._backoff(caller, attempt, e)
+                continue
+            except BaseException as e:
+                self._release(state)
+                if isinstance(e, Exception):
+                    self._record_failure(caller, started)
+                raise
+            self._release(state)
+
+            usage = response.usage
+            prompt_tokens = usage.prompt_tokens if usage else estimate - max_tokens
+            completion_tokens = usage.completion_tokens if usage else max_tokens
+            self._settle(estimate, prompt_tokens + completion_tokens)
+            self._record_success(caller, started, prompt_tokens, completion_tokens)
+            return response
+
+    async def stream(self, caller: str, priority: int, messages: List[dict], max_tokens: int, **kwargs) -> AsyncIterator[str]:
+        """
+        Like complete with stream=True, yielding the pieces of the answer. Only
+        opening the stream is retried. The slot is held until the stream ends;
+        closing the generator early closes the upstream response.
+        """
+        estimate = estimate_tokens(messages, max_tokens)
+        started = time.monotonic()
+        for attempt in itertools.count():
+            state = await self._acquire(caller, priority, estimate)
+            try:
+                stream = await state.client.chat.completions.create(
+                    messages=messages, max_tokens=max_tokens, stream=True, **kwargs
+                )
+                break
+            except RETRYABLE_ERRORS as e:
+                self._release(state)
+                if attempt >= LLM_MAX_RETRIES:
+                    self._record_failure(caller, started)
+                    raise
+                await self._backoff(caller, attempt, e)
+            except BaseException as e:
+                self._release(state)
+                if isinstance(e, Exception):
+                    self._record_failure(caller, started)
+                raise
+
+        # Streamed responses report no usage: estimate it from the text
+        completion_chars = 0
+        failed = False
+        try:
+            async for chunk in stream:
+                piece = (chunk.choices[0].delta.content or "") if chunk.choices else ""
+                if piece:
+                    completion_chars += len(piece)
+                    yield piece
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(state)
+            prompt_tokens = estimate - max_tokens
+            completion_tokens = completion_chars // CHARS_PER_TOKEN
+            self._settle(estimate, prompt_tokens + completion_tokens)
+            if failed:
+                self._record_failure(caller, started)
+            else:
+                self._record_success(caller, started, prompt_tokens, completion_tokens)
+            await stream.response.aclose()
+
+    async def close(self) -> None:
+        """
+        Close the running loop's client. Other loops' state (e.g. the server's,
+        seen from a synchronous wrapper's thread) is left alone.
+        """
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            if state.timer is not None:
+                state.timer.cancel()
+            await state.client.close()
+
+    def report(self) -> dict:
+        """Per-caller counters with average latency and queueing, and the current load."""
+        callers = {}
+        for caller, stats in self.stats.items():
+            calls = stats["requests"] + stats["failures"]
+            callers[caller] = dict(
+                stats,
+                latency_ms=round(stats["latency_ms"]),
+                queue_ms=round(stats["queue_ms"]),
+                avg_latency_ms=round(stats["latency_ms"] / calls) if calls else None,
+                avg_queue_ms=round(stats["queue_ms"] / stats["attempts"]) if stats["attempts"] else None
+            )
+        states = list(self._states.values())
+        return {
+            "callers": callers,
+            "in_flight": sum(state.in_flight for state in states),
+            "queued": sum(1 for state in states for entry in state.waiting if not entry[3].done()),
+            "limits": {
+                "requests_per_minute": LLM_REQUESTS_PER_MINUTE,
+                "tokens_per_minute": LLM_TOKENS_PER_MINUTE,
+                "max_concurrency": LLM_MAX_CONCURRENCY,
+            },
+        }
+
+    def _loop_state(self) -> _LoopState:
+        # A new loop (e.g. a synchronous wrapper's asyncio.run) gets its own client and queue
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.api_key)
+        return state
+
+    async def _acquire(self, caller: str, priority: int, tokens: int) -> _LoopState:
+        """Wait for a concurrency slot and rate budget, by priority then arrival."""
+        state = self._loop_state()
+        future = state.loop.create_future()
+        heapq.heappush(state.waiting, (priority, next(self._arrivals), tokens, future))
+        queued = time.monotonic()
+        self._dispatch(state)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller was cancelled
+                self._release(state)
+            else:
+                self._dispatch(state)
+            raise
+        stats = self._caller_stats(caller)
+        stats["attempts"] += 1
+        stats["queue_ms"] += (time.monotonic() - queued) * 1000
+        return state
+
+    def _release(self, state: _LoopState) -> None:
+        state.in_flight -= 1
+        self._dispatch(state)
+
+    def _dispatch(self, state: _LoopState) -> None:
+        """Grant slots to waiting callers in order while concurrency and rate limits allow."""
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        while state.waiting and state.in_flight < LLM_MAX_CONCURRENCY:
+            _, _, tokens, future = state.waiting[0]
+            if future.done():
+                heapq.heappop(state.waiting)
+                continue
+            with self._bucket_lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                delay = max(self.requests.delay(1), self.tokens.delay(tokens))
+                if delay == 0:
+                    self.requests.level -= 1
+                    self.tokens.level -= min(tokens, self.tokens.capacity)
+            if delay > 0:
+                # Strict priority: later callers wait behind the head of the queue
+                state.timer = state.loop.call_later(delay, self._dispatch, state)
+                return
+            heapq.heappop(state.waiting)
+            state.in_flight += 1
+            future.set_result(None)
+
+    def _settle(self, reserved: int, used: int) -> None:
+        """Return unused reserved tokens to the bucket (or take the excess)."""
+        with self._bucket_lock:
+            self.tokens.level += min(reserved, self.tokens.capacity) - used
+
+    async def _backoff(self, caller: str, attempt: int, error: Exception) -> None:
+        self._caller_stats(caller)["retries"] += 1
+        delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, LLM_RETRY_MAX_DELAY))
+        print(f"OpenAI call for {caller} failed ({error}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _caller_stats(self, caller: str) -> dict:
+        stats = self.stats.get(caller)
+        if stats is None:
+            stats = self.stats[caller] = {
+                "requests": 0, "failures": 0, "retries": 0, "attempts": 0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+                "latency_ms": 0.0, "max_latency_ms": 0.0, "queue_ms": 0.0,
+            }
+        return stats
+
+    def _record_success(self, caller: str, started: float, prompt_tokens: int, completion_tokens: int) -> None:
+        stats = self._caller_stats(caller)
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        self._record_latency(stats, started)
+
+    def _record_failure(self, caller: str, started: float) -> None:
+        stats = self._caller_stats(caller)
+        stats["failures"] += 1
+        self._record_latency(stats, started)
+
+    @staticmethod
+    def _record_latency(stats: dict, started: float) -> None:
+        elapsed = (time.monotonic() - started) * 1000
+        stats["latency_ms"] += elapsed
+        stats["max_latency_ms"] = round(max(stats["max_latency_ms"], elapsed), 1)
+
+
+def estimate_tokens(messages: List[dict], max_tokens: int) -> int:
+    """Tokens to reserve for a call: the prompt estimated from its length plus the completion limit."""
+    return sum(len(message.get("content") or "") for message in messages) // CHARS_PER_TOKEN + max_tokens
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """The Retry-After header of a rate-limit or server error, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+llm_gateway = LLMGateway(os.getenv("OPENAI_API_KEY"))
@@ -1,16 +1,51 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 import os
+import json
+import asyncio
 from dotenv import load_dotenv
 
-from analyzer import analyze_text
-from scraper import scrape_terms_and_conditions
-from chatbot import get_chat_response
+from analyzer import (
+    analyzer_client_configured,
+    shutdown_rules_pool,
+    result_cache,
+    analysis_flights,
+    tier_report,
+)
+from scraper import (
+    async_scrape_terms_and_conditions,
+    async_scrape_with_details,
+    open_scraper_pools,
+    close_scraper_pools,
+    get_render_stats,
+    http_cache,
+    strategy_memory,
+    scrape_flights,
+    validate_url,
+    normalize_url,
+)
+from clause_analysis import (
+    analyze_document_with_rules,
+    async_analyze_document,
+    clause_cache,
+    document_known,
+    new_text_document_id,
+    text_document_key,
+    url_document_key,
+)
+from chatbot import async_get_chat_response, stream_chat_response, chat_cache
+from llm_gateway import llm_gateway
+from document_sessions import DocumentSession, document_sessions
 
 load_dotenv()
 
+# /analyze/batch limits: items per request and items processed at once
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
 app = FastAPI(title="ClauseGuard API", version="1.0.0")
 
 # CORS middleware
@@ -26,23 +61,53 @@ app.add_middleware(
 class AnalyzeRequest(BaseModel):
     text: Optional[str] = None
     url: Optional[str] = None
+    # For pasted text: the document_id of an earlier /analyze of a previous version
+    document_id: Optional[str] = None
+
+
+class ChangedClause(BaseModel):
+    status: str  # "added" | "modified" | "removed"
+    text: str
 
 
 class AnalyzeResponse(BaseModel):
     summary: str
     risk_score: str  # "Low" | "Medium" | "High"
     alerts: List[str]
+    provisional: bool = False  # True if OpenAI missed the deadline and rules answered
+    # Clauses changed since the previous version of the URL / document_id (None on first sight)
+    changed_clauses: Optional[List[ChangedClause]] = None
+    session_id: Optional[str] = None  # Pass to /chat to ask questions about this document
+    # Pasted text only: send with the next version of the text to get changed_clauses
+    document_id: Optional[str] = None
+
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzeRequest]
 
 
 class ChatRequest(BaseModel):
     question: str
-    context: str
+    session_id: Optional[str] = None  # From /analyze; answers use the document itself
+    context: Optional[str] = None  # Analysis summary, used when there is no (live) session
 
 
 class ChatResponse(BaseModel):
     answer: str
 
 
+@app.on_event("startup")
+async def startup():
+    await open_scraper_pools()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_scraper_pools()
+    await llm_gateway.close()
+    shutdown_rules_pool()
+
+
 @app.get("/")
 def root():
     return {"message": "ClauseGuard API is running"}
@@ -53,6 +118,26 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+def metrics():
+    """Runtime counters for tuning the scraping and analysis pipeline."""
+    return {
+        "playwright_render": get_render_stats(),
+        "http_cache": http_cache.stats,
+        "scrape_strategies": strategy_memory.report(),
+        "analysis_cache": result_cache.report(),
+        "clause_cache": clause_cache.report(),
+        "chat_cache": chat_cache.report(),
+        "llm_gateway": llm_gateway.report(),
+        "coalesced_requests": {
+            "scrape": scrape_flights.report(),
+            "analyze": analysis_flights.report(),
+        },
+        "tiered_analysis": tier_report(),
+        "document_sessions": document_sessions.report(),
+    }
+
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(request: AnalyzeRequest):
     """
@@ -60,44 +145,213 @@ async def analyze(request: AnalyzeRequest):
     Returns summary, risk score, and alerts.
     """
     try:
-        # Validate input
-        if not request.text and not request.url:
-            raise HTTPException(
-                status_code=400,
-                detail="Either 'text' or 'url' must be provided"
-            )
+        return await run_analysis(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
 
-        # Get text from URL or use provided text
-        text_to_analyze = ""
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many texts and/or URLs in one request.
+    Items run concurrently and results stream back as NDJSON in completion
+    order, one line per item: {"index": i, "result": {...}} on success or
+    {"index": i, "error": {"status_code": ..., "detail": ...}} on failure.
+    """
+    if not request.items:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one item is required"
+        )
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items: at most {BATCH_MAX_ITEMS} per batch"
+        )
+
+    return StreamingResponse(stream_batch(request.items), media_type="application/x-ndjson")
+
+
+async def stream_batch(items: List[AnalyzeRequest]) -> AsyncIterator[str]:
+    # Scrapes are further limited per host and OpenAI calls by ANALYSIS_CONCURRENCY
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_item(index: int, item: AnalyzeRequest) -> dict:
+        async with semaphore:
+            try:
+                # No chat sessions: batch documents would evict interactive users' sessions
+                response = await run_analysis(item, chat_session=False)
+                return {"index": index, "result": response.dict()}
+            except HTTPException as e:
+                return {"index": index, "error": {"status_code": e.status_code, "detail": e.detail}}
+            except Exception as e:
+                return {"index": index, "error": {"status_code": 500, "detail": f"Internal server error: {str(e)}"}}
+
+    tasks = [asyncio.ensure_future(run_item(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield json.dumps(await next_done) + "\n"
+    finally:
+        # The client went away: stop the remaining items
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: AnalyzeRequest):
+    """
+    Streaming variant of /analyze as server-sent events, emitted as each stage finishes:
+    - fetched: how the URL was scraped (strategy, bytes, revalidated, elapsed_ms); URLs only
+    - extracted: number of characters of text to analyze
+    - rules: the rule-based summary, risk score and alerts (almost immediately)
+    - result: the final /analyze response (OpenAI analysis when configured)
+    - error: status_code and detail if any stage fails (ends the stream)
+    """
+    return StreamingResponse(
+        stream_analysis(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_analysis(request: AnalyzeRequest) -> AsyncIterator[str]:
+    final_task = None
+    try:
+        validate_analyze_request(request)
+
+        text_to_analyze = request.text
         if request.url:
-            # scrape_terms_and_conditions raises HTTPException directly with proper error messages
-            text_to_analyze = scrape_terms_and_conditions(request.url)
+            details = await async_scrape_with_details(request.url)
+            text_to_analyze = details["text"]
+            yield sse_event("fetched", {
+                "strategy": details["strategy"],
+                "bytes": details["bytes"],
+                "revalidated": details["revalidated"],
+                "elapsed_ms": details["elapsed_ms"],
+            })
+
+        validate_analyze_text(text_to_analyze)
+        yield sse_event("extracted", {"chars": len(text_to_analyze)})
+
+        if analyzer_client_configured():
+            # The rule-based result comes first and is reused by the full analysis
+            rules = await analyze_document_with_rules(text_to_analyze)
+            yield sse_event("rules", {
+                "summary": rules["summary"],
+                "risk_score": rules["risk_score"],
+                "alerts": rules["alerts"],
+            })
+            final_task = asyncio.ensure_future(analyze_request_text(request, text_to_analyze, rules=rules))
+            response = await final_task
         else:
-            text_to_analyze = request.text
+            final_task = asyncio.ensure_future(analyze_request_text(request, text_to_analyze))
+            response = await final_task
+            yield sse_event("rules", {
+                "summary": response.summary,
+                "risk_score": response.risk_score,
+                "alerts": response.alerts,
+            })
 
-        if not text_to_analyze or len(text_to_analyze.strip()) < 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Text is too short or empty"
-            )
+        yield sse_event("result", response.dict())
+
+    except HTTPException as e:
+        yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"Internal server error: {str(e)}"})
+    finally:
+        # The client went away before the analysis finished
+        if final_task is not None and not final_task.done():
+            final_task.cancel()
+
+
+async def run_analysis(request: AnalyzeRequest, chat_session: bool = True) -> AnalyzeResponse:
+    """
+    Scrape (if needed) and analyze one /analyze request, raising HTTPException
+    on bad input. chat_session=False skips registering the document for /chat.
+    """
+    validate_analyze_request(request)
 
-        # Analyze the text
-        result = analyze_text(text_to_analyze)
+    # Get text from URL or use provided text
+    text_to_analyze = ""
+    if request.url:
+        # async_scrape_terms_and_conditions raises HTTPException directly with proper error messages
+        text_to_analyze = await async_scrape_terms_and_conditions(request.url)
+    else:
+        text_to_analyze = request.text
 
-        return AnalyzeResponse(
-            summary=result["summary"],
-            risk_score=result["risk_score"],
-            alerts=result["alerts"]
+    validate_analyze_text(text_to_analyze)
+    return await analyze_request_text(request, text_to_analyze, chat_session)
+
+
+def validate_analyze_request(request: AnalyzeRequest) -> None:
+    if not request.text and not request.url:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'text' or 'url' must be provided"
         )
 
-    except HTTPException:
-        raise
-    except Exception as e:
+
+def validate_analyze_text(text_to_analyze: Optional[str]) -> None:
+    if not text_to_analyze or len(text_to_analyze.strip()) < 10:
         raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
+            status_code=400,
+            detail="Text is too short or empty"
+        )
+
+
+async def analyze_request_text(
+    request: AnalyzeRequest,
+    text_to_analyze: str,
+    chat_session: bool = True,
+    rules: Optional[dict] = None
+) -> AnalyzeResponse:
+    # Documents are analyzed clause by clause so only clauses changed since the
+    # last version of the URL or document_id need new verdicts
+    document_id = None
+    if request.url:
+        key = url_document_key(normalize_url(validate_url(request.url)))
+        result = await async_analyze_document(key, text_to_analyze, rules=rules)
+    elif request.document_id:
+        key = text_document_key(request.document_id)
+        if not await asyncio.to_thread(document_known, key):
+            raise HTTPException(
+                status_code=404,
+                detail="Unknown or expired document_id. Analyze the text without it to get a new one."
+            )
+        document_id = request.document_id
+        result = await async_analyze_document(key, text_to_analyze, rules=rules)
+    else:
+        # Pasted text gets a document_id, and its clause verdicts are cached
+        # for the next version
+        document_id = new_text_document_id()
+        result = await async_analyze_document(text_document_key(document_id), text_to_analyze, rules=rules)
+
+    # Keep the document (and a passage index over it) for follow-up /chat questions
+    session_id = None
+    if chat_session:
+        session_id = await asyncio.to_thread(
+            document_sessions.register, text_to_analyze, result["summary"], result.get("provisional", False)
         )
 
+    return AnalyzeResponse(
+        summary=result["summary"],
+        risk_score=result["risk_score"],
+        alerts=result["alerts"],
+        provisional=result.get("provisional", False),
+        changed_clauses=result.get("changed_clauses"),
+        session_id=session_id,
+        document_id=document_id
+    )
+
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -105,19 +359,8 @@ async def chat(request: ChatRequest):
     Answer questions about the analyzed Terms and Conditions.
     """
     try:
-        if not request.question or not request.question.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Question is required"
-            )
-
-        if not request.context or not request.context.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Context is required"
-            )
-
-        answer = get_chat_response(request.question, request.context)
+        context, passages, session = await resolve_chat_context(request)
+        answer = await async_get_chat_response(request.question, context, passages, session)
 
         return ChatResponse(answer=answer)
 
@@ -129,3 +372,72 @@ async def chat(request: ChatRequest):
             detail=f"Internal server error: {str(e)}"
         )
 
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat as server-sent events:
+    - token: the next piece of the answer ({"text": ...}) as OpenAI generates it
+    - done: the complete answer ({"answer": ...})
+    - error: status_code and detail if generation fails (ends the stream)
+    Disconnecting stops the OpenAI generation.
+    """
+    context, passages, session = await resolve_chat_context(request)
+    return StreamingResponse(
+        stream_chat(request.question, context, passages, session),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_chat(
+    question: str,
+    context: str,
+    passages: Optional[List[str]],
+    session: Optional[DocumentSession]
+) -> AsyncIterator[str]:
+    answer = stream_chat_response(question, context, passages, session)
+    pieces = []
+    try:
+        async for piece in answer:
+            pieces.append(piece)
+            yield sse_event("token", {"text": piece})
+        yield sse_event("done", {"answer": "".join(pieces)})
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"Internal server error: {str(e)}"})
+    finally:
+        # Closes the OpenAI stream if the client went away mid-answer
+        await answer.aclose()
+
+
+async def resolve_chat_context(request: ChatRequest) -> Tuple[str, Optional[List[str]], Optional[DocumentSession]]:
+    """
+    Summary, relevant document passages and the document session (if any)
+    for a /chat request, raising HTTPException on bad input.
+    """
+    if not request.question or not request.question.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Question is required"
+        )
+
+    if request.session_id:
+        session = document_sessions.get(request.session_id)
+        if session is None and request.context and request.context.strip():
+            # Sessions live in one process's memory (lost on restart, not shared
+            # between workers): answer from the summary the client sent along
+            return request.context, None, None
+        if session is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Session not found or expired. Please analyze the document again."
+            )
+        return session.summary, session.relevant_passages(request.question), session
+
+    if not request.context or not request.context.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'session_id' or 'context' is required"
+        )
+
+    return request.context, None, None
@@ -0,0 +1,217 @@
+"""
+Result cache for analyze_text (also used for clause verdicts and document versions).
+
+Results are keyed by a hash of the normalized text together with the analyzer
+mode and version, so a document analyzed before comes back without another
+OpenAI round trip. An in-memory LRU tier answers popular documents; an
+optional SQLite tier survives restarts. Both tiers expire entries after a TTL.
+"""
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "86400"))  # seconds
+# SQLite file for the persistent tier ("none" keeps the cache in memory only)
+_db_env = os.getenv(
+    "RESULT_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache.sqlite3")
+)
+RESULT_CACHE_DB = None if _db_env.lower() in ("", "none", "off") else _db_env
+RESULT_CACHE_DB_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_DB_MAX_ENTRIES", "50000"))
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivially different copies share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, mode: str, version: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{mode}\0{version}\0".encode("utf-8"))
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU, optional SQLite) cache of JSON-serializable results.
+    Safe to use from worker threads; returned results are copies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl: float = RESULT_CACHE_TTL,
+        db_path: Optional[str] = RESULT_CACHE_DB,
+        db_max_entries: int = RESULT_CACHE_DB_MAX_ENTRIES,
+        table: str = "results"
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+        # Caches sharing one database file use separate tables (trusted name, not user input)
+        self.table = table
+        self._lock = threading.Lock()
+        # key -> (stored timestamp, result)
+        self._memory = OrderedDict()
+        self._db = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "evicted": 0, "expired": 0}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys) -> dict:
+        """Cached results for the given keys, as key -> result (missing keys are left out)."""
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                result = self._lookup(key, now)
+                if result is not None:
+                    found[key] = copy.deepcopy(result)
+            self._db_commit()
+        return found
+
+    def set(self, key: str, result: dict) -> None:
+        self.set_many({key: result})
+
+    def set_many(self, results: dict) -> None:
+        stored = time.time()
+        with self._lock:
+            for key, result in results.items():
+                entry = (stored, copy.deepcopy(result))
+                self._remember(key, entry)
+                self._db_set(key, entry)
+                self.stats["stored"] += 1
+            self._db_evict(stored)
+
+    def _lookup(self, key: str, now: float):
+        entry = self._memory.get(key)
+        if entry is not None:
+            if now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+            del self._memory[key]
+            self.stats["expired"] += 1
+
+        entry = self._db_get(key, now)
+        if entry is not None:
+            self.stats["disk_hits"] += 1
+            self._remember(key, entry)
+            return entry[1]
+
+        self.stats["misses"] += 1
+        return None
+
+    def report(self) -> dict:
+        """Counters plus the hit rate and the current size of the memory tier."""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        return dict(
+            stats,
+            entries=size,
+            hit_rate=round(hits / lookups, 3) if lookups else None,
+            persistent=self.db_path is not None
+        )
+
+    def _remember(self, key: str, entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        if self._db is None:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "key TEXT PRIMARY KEY, result TEXT NOT NULL, "
+                    "stored REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache database unavailable, using memory only: {e}")
+                self.db_path = None
+                self._db = None
+        return self._db
+
+    def _db_get(self, key: str, now: float):
+        db = self._connection()
+        if db is None:
+            return None
+        try:
+            row = db.execute(f"SELECT result, stored FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            result, stored = row
+            if now - stored > self.ttl:
+                db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.stats["expired"] += 1
+                return None
+            db.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            return (stored, json.loads(result))
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Could not read result cache entry: {e}")
+            return None
+
+    def _db_set(self, key: str, entry) -> None:
+        db = self._connection()
+        if db is None:
+            return
+        stored, result = entry
+        try:
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, result, stored, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), stored, stored)
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Could not write result cache entry: {e}")
+
+    def _db_evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used beyond the size cap, and commit."""
+        db = self._connection()
+        if db is None:
+            return
+        try:
+            db.execute(f"DELETE FROM {self.table} WHERE stored < ?", (now - self.ttl,))
+            db.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_entries,)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not evict result cache entries: {e}")
+        self._db_commit()
+
+    def _db_commit(self) -> None:
+        if self._db is not None:
+            try:
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not commit result cache changes: {e}")
@@ -0,0 +1,116 @@
+"""
+Per-host robots.txt cache with TTL, negative caching and strict fetch timeouts.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_CACHE_TTL = float(os.getenv("ROBOTS_CACHE_TTL", "21600"))  # seconds (6 hours)
+ROBOTS_NEGATIVE_TTL = float(os.getenv("ROBOTS_NEGATIVE_TTL", "600"))  # seconds, after fetch errors
+ROBOTS_FETCH_TIMEOUT = float(os.getenv("ROBOTS_FETCH_TIMEOUT", "3"))  # seconds
+ROBOTS_CACHE_MAX_HOSTS = int(os.getenv("ROBOTS_CACHE_MAX_HOSTS", "2000"))
+
+# fetch(robots_url, timeout) -> (status_code, body)
+RobotsFetcher = Callable[[str, float], Awaitable[Tuple[int, str]]]
+
+
+class RobotsCache:
+    """
+    Caches one parsed robots.txt per scheme+host.
+
+    Successful fetches (including 4xx "no robots.txt" answers) are kept for
+    ttl seconds. Timeouts, connection errors and 5xx answers are cached as
+    "unknown" for negative_ttl seconds so a broken host is not retried on
+    every request. Concurrent lookups for the same host share one fetch.
+    """
+
+    def __init__(
+        self,
+        fetch: RobotsFetcher,
+        ttl: float = ROBOTS_CACHE_TTL,
+        negative_ttl: float = ROBOTS_NEGATIVE_TTL,
+        timeout: float = ROBOTS_FETCH_TIMEOUT,
+        max_hosts: int = ROBOTS_CACHE_MAX_HOSTS
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.max_hosts = max_hosts
+        # host key -> (parser or None, expires_at)
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    async def get(self, url: str) -> Optional[RobotFileParser]:
+        """Return the parsed robots.txt for url's host, or None if unknown."""
+        key = self._host_key(url)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def can_fetch(self, url: str, user_agent: str) -> Optional[bool]:
+        """True/False per robots.txt, or None when robots.txt could not be fetched."""
+        parser = await self.get(url)
+        if parser is None:
+            return None
+        return parser.can_fetch(user_agent, url)
+
+    def crawl_delay(self, url: str, user_agent: str) -> Optional[float]:
+        """Crawl-delay for user_agent from the unexpired cached robots.txt, without fetching."""
+        entry = self._entries.get(self._host_key(url))
+        if entry is None or entry[0] is None or entry[1] <= time.monotonic():
+            return None
+        delay = entry[0].crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+
+    async def _load(self, key: str) -> Optional[RobotFileParser]:
+        robots_url = f"{key}/robots.txt"
+        parser = None
+        ttl = self.negative_ttl
+        try:
+            status, body = await asyncio.wait_for(
+                self.fetch(robots_url, self.timeout), timeout=self.timeout
+            )
+            # Same interpretation as RobotFileParser.read()
+            if status in (401, 403):
+                parser = RobotFileParser(robots_url)
+                parser.disallow_all = True
+                ttl = self.ttl
+            elif 400 <= status < 500:
+                parser = RobotFileParser(robots_url)
+                parser.allow_all = True
+                ttl = self.ttl
+            elif status < 400:
+                parser = RobotFileParser(robots_url)
+                parser.parse(body.splitlines())
+                ttl = self.ttl
+            else:
+                logger.info(f"robots.txt for {key} returned {status}, caching as unknown")
+        except Exception as e:
+            logger.info(f"Could not fetch robots.txt for {key}: {e!r}")
+
+        self._entries[key] = (parser, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_hosts:
+            self._entries.popitem(last=False)
+        return parser
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
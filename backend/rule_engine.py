@@ -0,0 +1,196 @@
+"""
+Compiled rule engine for the rule-based Terms & Conditions analysis.
+
+Every rule pattern is a sequence of keywords that must appear in order on the
+same line, with at most RULE_PROXIMITY_WINDOW characters between one keyword
+and the next (the original regexes used an unbounded ".*"). All keywords are
+found in one scan of the text with a single compiled alternation; the patterns
+are then checked against the sorted keyword positions, so the cost grows
+linearly with the document instead of backtracking on every ".*".
+Run "python benchmarks.py rules" to compare with the legacy regexes.
+"""
+import os
+import re
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Maximum gap in characters between consecutive keywords of a pattern ("none" = unbounded)
+_window_env = os.getenv("RULE_PROXIMITY_WINDOW", "200")
+RULE_PROXIMITY_WINDOW = None if _window_env.lower() in ("", "none", "off") else int(_window_env)
+
+
+class Rule:
+    """A risk category: matches if any of its keyword patterns matches."""
+
+    def __init__(self, name: str, alert: str, points: int, patterns: Sequence[Sequence[str]]):
+        self.name = name
+        self.alert = alert
+        self.points = points
+        self.patterns = [tuple(pattern) for pattern in patterns]
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+RULES = [
+    Rule(
+        "payment",
+        "Contains automatic renewal or recurring payment clauses",
+        2,
+        [
+            ("automatic", "renewal"),
+            ("auto", "renew"),
+            ("recurring", "charge"),
+            ("subscription", "fee"),
+            ("hidden", "fee"),
+            ("processing", "fee"),
+            ("cancellation", "fee"),
+        ],
+    ),
+    Rule(
+        "data",
+        "Collects and may share personal data with third parties",
+        1,
+        [
+            ("collect", "personal", "data"),
+            ("share", "third", "party"),
+            ("sell", "data"),
+            ("data", "collection"),
+            ("tracking", "cookies"),
+            ("analytics", "data"),
+        ],
+    ),
+    Rule(
+        "legal",
+        "Contains restrictive legal clauses (arbitration, liability waivers)",
+        2,
+        [
+            ("arbitration", "only"),
+            ("waive", "liability"),
+            ("no", "refund"),
+            ("as", "is", "basis"),
+            ("disclaim", "warranty"),
+            ("limit", "liability"),
+        ],
+    ),
+    Rule(
+        "cancellation",
+        "Restrictive cancellation policy",
+        1,
+        [
+            ("no", "cancel"),
+            ("cancel", "not", "allowed"),
+            ("cancel", "restriction"),
+        ],
+    ),
+]
+
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """
+    Regex alternation of keywords factored into a prefix trie, e.g.
+    ["auto", "automatic", "as"] -> "a(?:s|uto(?:matic)?)". At each position
+    the regex engine follows one branch per character instead of trying every
+    keyword, and optional suffixes are greedy so the longest keyword wins.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1:
+            body = branches[0]
+            grouped = body if len(body) == 1 else f"(?:{body})"
+        else:
+            body = grouped = "(?:" + "|".join(branches) + ")"
+        return grouped + "?" if "" in node else body
+
+    return build(trie)
+
+
+class RuleEngine:
+    """Matches a fixed list of rules against lowercased text in one scan."""
+
+    def __init__(self, rules: Sequence[Rule] = RULES, window: Optional[int] = RULE_PROXIMITY_WINDOW):
+        self.rules = list(rules)
+        self.window = window
+        # Changes whenever the rules or window do (part of the analysis cache key)
+        self.version = hashlib.sha256(repr(
+            [(rule.name, rule.alert, rule.points, rule.patterns) for rule in self.rules] + [window]
+        ).encode("utf-8")).hexdigest()[:12]
+
+        keywords = sorted(
+            {keyword for rule in self.rules for pattern in rule.patterns for keyword in pattern},
+            key=len,
+            reverse=True
+        )
+        # A zero-width lookahead reports the longest keyword starting at every
+        # position, so overlapping keywords ("as" inside "basis") are all seen.
+        # Newlines are scanned too, to keep patterns within one line.
+        self._scanner = re.compile("(?=(" + _trie_pattern(keywords) + "|\n))")
+        # Every keyword that occurs wherever the longest one does (its prefixes)
+        self._prefixes = {
+            keyword: [other for other in keywords if keyword.startswith(other)]
+            for keyword in keywords
+        }
+
+    def scan(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Positions of every keyword as (start, line number) lists, in text order."""
+        occurrences = {keyword: [] for keyword in self._prefixes}
+        prefixes = self._prefixes
+        line = 0
+        for match in self._scanner.finditer(text):
+            keyword = match.group(1)
+            if keyword == "\n":
+                line += 1
+                continue
+            position = (match.start(), line)
+            for found in prefixes[keyword]:
+                occurrences[found].append(position)
+        return occurrences
+
+    def match(self, text: str) -> List[Rule]:
+        """Rules with at least one matching pattern in text (expected lowercase)."""
+        occurrences = self.scan(text)
+        return [
+            rule for rule in self.rules
+            if any(self._pattern_matches(pattern, occurrences) for pattern in rule.patterns)
+        ]
+
+    def _pattern_matches(self, pattern: Tuple[str, ...], occurrences) -> bool:
+        first = pattern[0]
+        # End positions (with line) of partial matches of the pattern so far
+        ends = [(start + len(first), line) for start, line in occurrences[first]]
+        for keyword in pattern[1:]:
+            if not ends:
+                return False
+            next_ends = []
+            index = 0
+            latest = None
+            for start, line in occurrences[keyword]:
+                # Latest partial match ending before this keyword starts
+                while index < len(ends) and ends[index][0] <= start:
+                    latest = ends[index]
+                    index += 1
+                if (
+                    latest is not None
+                    and latest[1] == line
+                    and (self.window is None or start - latest[0] <= self.window)
+                ):
+                    next_ends.append((start + len(keyword), line))
+            ends = next_ends
+        return bool(ends)
+
+
+rule_engine = RuleEngine()
+
+
+def match_rule_names(texts: List[str]) -> List[List[str]]:
+    """Names of the rules matching each text (process-pool friendly)."""
+    return [[rule.name for rule in rule_engine.match(text.lower())] for text in texts]
@@ -0,0 +1,119 @@
+"""
+Single-pass writing-system profile used to spot non-English documents.
+
+Instead of one regex scan per script, the text (or an evenly spread sample of
+it for very large inputs) is walked once, each letter is classified by
+Unicode block, and the decision is made from per-script ratios. A handful of
+accented letters, e.g. in a company name, no longer marks an English
+document as foreign.
+"""
+import os
+from typing import Dict, Optional
+
+SCRIPT_SAMPLE_SIZE = int(os.getenv("SCRIPT_SAMPLE_SIZE", "65536"))  # characters
+# Share of letters from non-Latin scripts above which a document is non-English
+NON_LATIN_THRESHOLD = float(os.getenv("NON_LATIN_THRESHOLD", "0.2"))
+# Share of accented Latin letters above which a Latin-script document is non-English
+ACCENTED_THRESHOLD = float(os.getenv("ACCENTED_THRESHOLD", "0.005"))
+MIN_ACCENTED_LETTERS = 3
+
+# Windows the sample is spread over, so a long English preamble cannot hide the rest
+SAMPLE_WINDOWS = 16
+# Early exit: check every EARLY_EXIT_STRIDE characters once MIN_EARLY_EXIT_LETTERS are seen
+EARLY_EXIT_STRIDE = 2048
+MIN_EARLY_EXIT_LETTERS = 500
+
+SCRIPTS = ("latin", "accented_latin", "greek", "cyrillic", "hebrew", "arabic", "cjk", "other")
+LATIN, ACCENTED, GREEK, CYRILLIC, HEBREW, ARABIC, CJK, OTHER = range(len(SCRIPTS))
+NON_LETTER = -1
+NON_LATIN = (GREEK, CYRILLIC, HEBREW, ARABIC, CJK, OTHER)
+
+# Memoised character -> script index; documents reuse a small alphabet
+_char_scripts = {}
+
+
+def _classify(char: str) -> int:
+    if not char.isalpha():
+        return NON_LETTER
+    code = ord(char)
+    if code < 0x80:
+        return LATIN
+    if 0xC0 <= code <= 0x24F and code not in (0xD7, 0xF7):
+        return ACCENTED
+    if 0x370 <= code <= 0x3FF:
+        return GREEK
+    if 0x400 <= code <= 0x52F:
+        return CYRILLIC
+    if 0x590 <= code <= 0x5FF:
+        return HEBREW
+    if 0x600 <= code <= 0x6FF or 0x750 <= code <= 0x77F:
+        return ARABIC
+    if (
+        0x3040 <= code <= 0x30FF      # Hiragana, Katakana
+        or 0x3400 <= code <= 0x9FFF   # CJK ideographs
+        or 0xAC00 <= code <= 0xD7AF   # Hangul
+    ):
+        return CJK
+    return OTHER
+
+
+def _sample(text: str, sample_size: Optional[int]) -> str:
+    if not sample_size or len(text) <= sample_size:
+        return text
+    window = sample_size // SAMPLE_WINDOWS
+    step = (len(text) - window) // (SAMPLE_WINDOWS - 1)
+    return "".join(text[i * step:i * step + window] for i in range(SAMPLE_WINDOWS))
+
+
+def script_profile(text: str, sample_size: Optional[int] = SCRIPT_SAMPLE_SIZE) -> Dict[str, float]:
+    """
+    Share of letters per script (keys from SCRIPTS) plus "letters", the number
+    of letters inspected. Stops early once the sample is clearly non-Latin.
+    """
+    counts = [0] * len(SCRIPTS)
+    letters = 0
+    if text.isascii():
+        # Fast path (the common case): every letter is unaccented Latin
+        letters = sum(map(str.isalpha, _sample(text, sample_size)))
+        counts[LATIN] = letters
+    else:
+        scripts = _char_scripts
+        for position, char in enumerate(_sample(text, sample_size)):
+            script = scripts.get(char)
+            if script is None:
+                script = scripts[char] = _classify(char)
+            if script != NON_LETTER:
+                counts[script] += 1
+                letters += 1
+            if (
+                position % EARLY_EXIT_STRIDE == 0
+                and letters >= MIN_EARLY_EXIT_LETTERS
+                and sum(counts[index] for index in NON_LATIN) >= 2 * NON_LATIN_THRESHOLD * letters
+            ):
+                break
+
+    profile = {
+        name: (counts[index] / letters if letters else 0.0)
+        for index, name in enumerate(SCRIPTS)
+    }
+    profile["letters"] = letters
+    profile["accented_letters"] = counts[ACCENTED]
+    return profile
+
+
+def is_likely_non_english(text: str, sample_size: Optional[int] = SCRIPT_SAMPLE_SIZE) -> bool:
+    """Threshold decision on script_profile()."""
+    profile = script_profile(text, sample_size)
+    if not profile["letters"]:
+        return False
+
+    non_latin = sum(profile[SCRIPTS[index]] for index in NON_LATIN)
+    if non_latin >= NON_LATIN_THRESHOLD:
+        return True
+
+    latin_letters = profile["latin"] + profile["accented_latin"]
+    return (
+        profile["accented_letters"] >= MIN_ACCENTED_LETTERS
+        and latin_letters > 0
+        and profile["accented_latin"] / latin_letters >= ACCENTED_THRESHOLD
+    )
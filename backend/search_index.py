@@ -0,0 +1,199 @@
+"""
+Term-level text search used by the chat endpoints.
+
+tokenize() turns text into normalized terms (lowercased words without stop
+words, with common English suffixes stripped), and BM25Index ranks a fixed
+list of passages against a query, using an inverted index built once so each
+search only touches the passages that share a term with the query.
+SentenceIndex does the same for the sentences of a document, with term
+positions so sentences containing the question's words as a phrase rank
+higher, and returns the sentences with their character offsets.
+"""
+import re
+import math
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List, Tuple
+
+from text_chunks import sentence_spans
+
+WORD = re.compile(r"\w+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me might more most must my myself of off on once only or other our ours
+ourselves out over own same shall she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+""".split())  # Negations are kept: "can I cancel" and "can I not cancel" differ
+
+# Pronouns that say who does what to whom: stop words for search, but kept in
+# normalize_question's keys ("can they cancel my account" is not "can I cancel their account")
+ROLE_WORDS = frozenset("""
+i me my mine myself we us our ours ourselves you your yours yourself yourselves
+they them their theirs themselves he him his she her hers
+""".split())
+
+# Longest first, so "ations" is stripped before "s"
+SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "able", "ing", "ies", "ied", "ers", "er", "ed", "ly", "s")
+MIN_STEM_CHARS = 3
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+# SentenceIndex: extra score, relative to the rarer term's idf, for two query
+# terms that appear next to each other in a sentence
+PHRASE_WEIGHT = 1.0
+# Sentences per requested result that are checked for phrase matches
+PHRASE_CANDIDATES_PER_RESULT = 10
+# Highest-weighted sentences per term that a SentenceIndex search looks at
+MAX_POSTINGS_PER_TERM = 128
+
+
+def stem(word: str) -> str:
+    """
+    Strip one common English suffix and then a final "e" (so "share", "shared"
+    and "sharing" meet), keeping at least MIN_STEM_CHARS characters.
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_CHARS:
+            word = word[:-len(suffix)]
+            if suffix in ("ies", "ied"):
+                word += "y"
+            break
+    if word.endswith("e") and len(word) > MIN_STEM_CHARS:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Search terms of a text, in order: lowercased, stop words removed, stemmed."""
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def normalize_question(question: str) -> str:
+    """
+    Canonical form of a question for cache keys: its terms and role pronouns
+    in order, so punctuation, casing and filler words do not matter ("Can I get
+    a refund?" and "can i get refunds" both give "i get refund") but who does
+    what to whom still does.
+    """
+    return " ".join(
+        word if word in ROLE_WORDS else stem(word)
+        for word in WORD.findall(question.lower())
+        if word in ROLE_WORDS or word not in STOP_WORDS
+    )
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a fixed list of passages."""
+
+    def __init__(self, passages: List[str]):
+        self.passages = passages
+        # term -> [(passage index, term frequency), ...]
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths = []
+        for index, passage in enumerate(passages):
+            terms = tokenize(passage)
+            self._lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self._postings.setdefault(term, []).append((index, count))
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Up to k (passage index, score) pairs, best first; passages sharing no term are left out."""
+        total = len(self.passages)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, count in postings:
+                norm = 1 - BM25_B + BM25_B * self._lengths[index] / (self._average_length or 1)
+                scores[index] = scores.get(index, 0.0) + idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class SentenceIndex:
+    """
+    Positional inverted index over the sentences of a document. BM25 weights
+    are computed at build time and each term's postings are kept in impact
+    order (highest weight first), so a search adds up at most
+    MAX_POSTINGS_PER_TERM weights per query term: its cost does not grow with
+    the document, and the sentences left out for a very common term are the
+    ones it contributes least to.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.spans = sentence_spans(text)
+        sentences = [tokenize(text[start:end]) for start, end in self.spans]
+        average_length = (sum(map(len, sentences)) / len(sentences)) if sentences else 0.0
+
+        positions: Dict[str, Dict[int, List[int]]] = {}
+        for index, terms in enumerate(sentences):
+            for position, term in enumerate(terms):
+                positions.setdefault(term, {}).setdefault(index, []).append(position)
+
+        # term -> (idf, [(sentence index, BM25 weight), ...] by weight, {sentence index: positions})
+        self._postings: Dict[str, Tuple[float, List[Tuple[int, float]], Dict[int, frozenset]]] = {}
+        total = len(self.spans)
+        for term, by_sentence in positions.items():
+            idf = math.log(1 + (total - len(by_sentence) + 0.5) / (len(by_sentence) + 0.5))
+            impacts = []
+            for index, term_positions in by_sentence.items():
+                count = len(term_positions)
+                norm = 1 - BM25_B + BM25_B * len(sentences[index]) / (average_length or 1)
+                impacts.append((index, idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)))
+            impacts.sort(key=lambda impact: -impact[1])
+            self._postings[term] = (
+                idf,
+                impacts[:MAX_POSTINGS_PER_TERM],
+                {index: frozenset(term_positions) for index, term_positions in by_sentence.items()}
+            )
+
+    def search(self, query: str, k: int) -> List[dict]:
+        """
+        Up to k best-matching sentences, best first, as {"text", "start", "end",
+        "score"} with text[start:end] == the sentence.
+        """
+        terms = tokenize(query)
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            entry = self._postings.get(term)
+            if entry is not None:
+                for index, weight in entry[1]:
+                    scores[index] = scores.get(index, 0.0) + weight
+
+        # Adjacent query terms that are also adjacent in the sentence, checked
+        # for the best candidates only (they already score for both terms)
+        phrases = []
+        for first, second in zip(terms, terms[1:]):
+            if first != second and first in self._postings and second in self._postings:
+                first_idf, _, first_positions = self._postings[first]
+                second_idf, _, second_positions = self._postings[second]
+                phrases.append((first_positions, second_positions, PHRASE_WEIGHT * min(first_idf, second_idf)))
+
+        ranked = []
+        for index, score in heapq.nlargest(k * PHRASE_CANDIDATES_PER_RESULT, scores.items(), key=itemgetter(1)):
+            for first_positions, second_positions, bonus in phrases:
+                first = first_positions.get(index)
+                second = second_positions.get(index)
+                if first and second and any(position + 1 in second for position in first):
+                    score += bonus
+            ranked.append((index, score))
+
+        best = sorted(ranked, key=lambda item: (-item[1], item[0]))[:k]
+        return [
+            {
+                "text": self.text[self.spans[index][0]:self.spans[index][1]],
+                "start": self.spans[index][0],
+                "end": self.spans[index][1],
+                "score": round(score, 3)
+            }
+            for index, score in best
+        ]
@@ -0,0 +1,44 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+The first caller for a key starts the work; callers arriving while it is still
+running await the same task instead of repeating it (e.g. dozens of users
+submitting the same viral URL at once).
+"""
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Map of key -> running task. The work runs in its own task, so a caller
+    that gets cancelled (e.g. a client disconnect) does not cancel it for the
+    others. Results and exceptions are shared by every caller.
+    """
+
+    def __init__(self):
+        self._running = {}
+        self.stats = {"started": 0, "collapsed": 0}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._running.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.stats["collapsed"] += 1
+        else:
+            task = asyncio.ensure_future(factory())
+            self._running[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["started"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._running.get(key) is task:
+            del self._running[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when no caller is left to await it
+            task.exception()
+
+    def report(self) -> dict:
+        return dict(self.stats, in_flight=len(self._running))
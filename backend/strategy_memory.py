@@ -0,0 +1,144 @@
+"""
+Per-domain memory of which scrape strategy works, so later requests for the
+same domain can go straight to it instead of re-learning failures.
+"""
+import os
+import time
+import random
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, TypeVar
+
+STRATEGY_MEMORY_TTL = float(os.getenv("STRATEGY_MEMORY_TTL", "86400"))  # seconds
+STRATEGY_REPROBE_RATE = float(os.getenv("STRATEGY_REPROBE_RATE", "0.1"))
+STRATEGY_MEMORY_MAX_DOMAINS = int(os.getenv("STRATEGY_MEMORY_MAX_DOMAINS", "5000"))
+# Failures in a row before a domain's winner is dropped (one 403 on some other page is not enough)
+STRATEGY_WINNER_MAX_FAILURES = int(os.getenv("STRATEGY_WINNER_MAX_FAILURES", "3"))
+
+# Smoothing factor for the per-strategy latency average
+LATENCY_EWMA_ALPHA = 0.3
+
+T = TypeVar("T")
+
+
+class StrategyMemory:
+    """
+    Remembers, per domain, success/failure counts and average latency of each
+    strategy plus the strategy that last succeeded (the winner).
+
+    order() moves a fresh winner to the front of the strategy list and moves
+    strategies that have failed on the domain without ever succeeding to the
+    back, as fallbacks that are not worth hedging into. With probability
+    reprobe_rate the default (cheapest first) order is kept so a cheaper
+    strategy that started working again can take over.
+    """
+
+    def __init__(
+        self,
+        ttl: float = STRATEGY_MEMORY_TTL,
+        reprobe_rate: float = STRATEGY_REPROBE_RATE,
+        max_domains: int = STRATEGY_MEMORY_MAX_DOMAINS,
+        winner_max_failures: int = STRATEGY_WINNER_MAX_FAILURES,
+        rng: Optional[random.Random] = None
+    ):
+        self.ttl = ttl
+        self.reprobe_rate = reprobe_rate
+        self.max_domains = max_domains
+        self.winner_max_failures = winner_max_failures
+        self.rng = rng or random.Random()
+        # domain -> {"winner": name, "updated": timestamp, "strategies": {name: stats}}
+        self._domains = OrderedDict()
+        self.stats = {"shortcuts": 0, "reprobes": 0, "cold": 0}
+
+    def order(self, domain: str, strategies: Sequence[Tuple[str, T]]) -> Tuple[List[Tuple[str, T]], int]:
+        """
+        Return the (name, value) strategies with the domain's winner first and
+        known failures last, and how many known failures there are at the end.
+        """
+        strategies = list(strategies)
+        entry = self._fresh_entry(domain)
+        if entry is None:
+            self.stats["cold"] += 1
+            return strategies, 0
+        winner = entry["winner"]
+        failing = {
+            name for name, stats in entry["strategies"].items()
+            if stats["failures"] and not stats["successes"] and name != winner
+        }
+        if winner in (None, strategies[0][0]) and not failing:
+            if winner is None:
+                self.stats["cold"] += 1
+            return strategies, 0
+        if self.rng.random() < self.reprobe_rate:
+            self.stats["reprobes"] += 1
+            return strategies, 0
+
+        self.stats["shortcuts"] += 1
+        fallbacks = [item for item in strategies if item[0] in failing]
+        if len(fallbacks) == len(strategies):
+            # Nothing has worked here yet: keep trying everything
+            return strategies, 0
+        return (
+            [item for item in strategies if item[0] == winner]
+            + [item for item in strategies if item[0] != winner and item[0] not in failing]
+            + fallbacks
+        ), len(fallbacks)
+
+    def winner(self, domain: str) -> Optional[str]:
+        """The strategy that last succeeded for domain, unless it has expired."""
+        entry = self._fresh_entry(domain)
+        return entry["winner"] if entry is not None else None
+
+    def record_success(self, domain: str, name: str, latency: float) -> None:
+        entry = self._entry(domain)
+        stats = self._strategy_stats(entry, name)
+        stats["successes"] += 1
+        stats["failures_in_a_row"] = 0
+        if stats["avg_latency"] is None:
+            stats["avg_latency"] = latency
+        else:
+            stats["avg_latency"] += LATENCY_EWMA_ALPHA * (latency - stats["avg_latency"])
+        entry["winner"] = name
+        entry["updated"] = time.time()
+
+    def record_failure(self, domain: str, name: str) -> None:
+        entry = self._entry(domain)
+        stats = self._strategy_stats(entry, name)
+        stats["failures"] += 1
+        stats["failures_in_a_row"] += 1
+        if entry["winner"] == name and stats["failures_in_a_row"] >= self.winner_max_failures:
+            # The winner stopped working, fall back to the default order
+            entry["winner"] = None
+        entry["updated"] = time.time()
+
+    def report(self) -> dict:
+        """Counters plus how many remembered domains each strategy wins."""
+        winners = {}
+        for entry in self._domains.values():
+            if entry["winner"] is not None:
+                winners[entry["winner"]] = winners.get(entry["winner"], 0) + 1
+        return dict(self.stats, domains=len(self._domains), winners=winners)
+
+    def _fresh_entry(self, domain: str) -> Optional[dict]:
+        """The domain's entry, unless it is missing or has expired."""
+        entry = self._domains.get(domain)
+        if entry is None:
+            return None
+        if time.time() - entry["updated"] > self.ttl:
+            del self._domains[domain]
+            return None
+        return entry
+
+    def _entry(self, domain: str) -> dict:
+        entry = self._domains.get(domain)
+        if entry is None:
+            entry = self._domains[domain] = {"winner": None, "updated": time.time(), "strategies": {}}
+            while len(self._domains) > self.max_domains:
+                self._domains.popitem(last=False)
+        self._domains.move_to_end(domain)
+        return entry
+
+    @staticmethod
+    def _strategy_stats(entry: dict, name: str) -> dict:
+        return entry["strategies"].setdefault(
+            name, {"successes": 0, "failures": 0, "failures_in_a_row": 0, "avg_latency": None}
+        )
@@ -0,0 +1,142 @@
+"""
+Split Terms & Conditions text into chunks on clause boundaries.
+
+Pasted text keeps its paragraphs (newlines); scraped text is usually one long
+line, so paragraphs that are too long are split further at sentence ends,
+preferably right before a numbered clause ("12.", "Section 4", "Article 7").
+"""
+import re
+import zlib
+from typing import List, Tuple
+
+# Sentence end followed by the start of a new sentence or clause
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+(?=[\"'(\[]?[A-Z0-9])")
+# Start of a numbered clause or section heading
+CLAUSE_START = re.compile(r"(?:\d+(?:\.\d+)*\.?\s|(?:section|article|clause)\s+\d)", re.I)
+# Without headings, long paragraphs end a clause after roughly one sentence in
+# CLAUSE_ANCHOR_EVERY, once the clause has at least MIN_ANCHORED_CLAUSE_CHARS characters
+CLAUSE_ANCHOR_EVERY = 4
+MIN_ANCHORED_CLAUSE_CHARS = 200
+# A bare clause number ("12." or "4.2.") split off from its heading
+CLAUSE_NUMBER = re.compile(r"\d+(?:\.\d+)*\.?")
+# Sentence end or line break
+SENTENCE_BREAK = re.compile(SENTENCE_BOUNDARY.pattern + r"|\s*\n\s*")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Non-empty lines of text, stripped."""
+    return [line.strip() for line in text.split("\n") if line.strip()]
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) character offsets of the sentences of text, without surrounding
+    whitespace. Lines always end a sentence; a bare clause number stays with
+    the sentence after it.
+    """
+    spans = []
+    number_start = None
+    start = 0
+    for match in list(SENTENCE_BREAK.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        sentence = text[start:end]
+        stripped = sentence.strip()
+        if stripped:
+            first = start + len(sentence) - len(sentence.lstrip())
+            if CLAUSE_NUMBER.fullmatch(stripped):
+                if number_start is None:
+                    number_start = first
+            else:
+                spans.append((first if number_start is None else number_start, first + len(stripped)))
+                number_start = None
+        start = match.end() if match else end
+    if number_start is not None:
+        spans.append((number_start, len(text.rstrip())))
+    return spans
+
+
+def split_units(text: str, max_chars: int) -> List[str]:
+    """
+    Paragraphs of text, with any paragraph longer than max_chars split at
+    sentence boundaries and, as a last resort, at whitespace.
+    """
+    units = []
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        number = ""
+        for sentence in SENTENCE_BOUNDARY.split(paragraph):
+            if CLAUSE_NUMBER.fullmatch(sentence):
+                number += sentence + " "
+                continue
+            sentence = number + sentence
+            number = ""
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                units.append(sentence)
+        if number:
+            units.append(number.rstrip())
+    return units
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Pack consecutive units of text into chunks of at most max_chars characters.
+    Once a chunk is three quarters full, a new chunk is started at the next clause
+    heading so clauses are not cut in two.
+    """
+    chunks = []
+    current = []
+    length = 0
+    for unit in split_units(text, max_chars):
+        extra = len(unit) + (1 if current else 0)
+        if current and (
+            length + extra > max_chars
+            or (length >= max_chars * 3 // 4 and CLAUSE_START.match(unit))
+        ):
+            chunks.append("\n".join(current))
+            current = []
+            length = 0
+            extra = len(unit)
+        current.append(unit)
+        length += extra
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def split_clauses(text: str, max_chars: int) -> List[str]:
+    """
+    Clauses of text for clause-level analysis. Every paragraph is split on its
+    own; long paragraphs (scraped pages are usually a single line) are cut into
+    runs of sentences at every clause heading, at max_chars, and after
+    "anchor" sentences chosen by a hash of their content. Boundaries therefore
+    depend only on nearby text, so an edit changes the clauses around it and
+    leaves the rest of the document's clauses identical.
+    """
+    clauses = []
+    for paragraph in split_paragraphs(text):
+        current = []
+        length = 0
+        for unit in split_units(paragraph, max_chars):
+            extra = len(unit) + (1 if current else 0)
+            if current and (length + extra > max_chars or CLAUSE_START.match(unit)):
+                clauses.append(" ".join(current))
+                current = []
+                length = 0
+                extra = len(unit)
+            current.append(unit)
+            length += extra
+            if length >= MIN_ANCHORED_CLAUSE_CHARS and zlib.crc32(unit.encode("utf-8")) % CLAUSE_ANCHOR_EVERY == 0:
+                clauses.append(" ".join(current))
+                current = []
+                length = 0
+        if current:
+            clauses.append(" ".join(current))
+    return clauses
@@ -1,18 +1,28 @@
 import React, { useState } from 'react'
-import axios from 'axios'
 import './App.css'
 import AnalysisResult from './components/AnalysisResult'
 import ChatBox from './components/ChatBox'
+import { postEventStream } from './eventStream'
 
 const API_BASE_URL = 'https://clausegaurd.onrender.com'
 
+// POST to /analyze/stream and call onEvent(event, data) for every server-sent event
+const streamAnalysis = (body, onEvent) =>
+  postEventStream(`${API_BASE_URL}/analyze/stream`, body, onEvent)
+
+const formatBytes = (bytes) =>
+  bytes >= 1024 * 1024
+    ? `${(bytes / (1024 * 1024)).toFixed(1)} MB`
+    : `${(bytes / 1024).toFixed(1)} KB`
+
 function App() {
   const [text, setText] = useState('')
   const [url, setUrl] = useState('')
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
+  const [progress, setProgress] = useState('')
   const [analysisResult, setAnalysisResult] = useState(null)
-  const [chatContext, setChatContext] = useState('')
+  const [sessionId, setSessionId] = useState('')
 
   const handleAnalyze = async () => {
     if (!text.trim() && !url.trim()) {
@@ -22,20 +32,52 @@ function App() {
 
     setLoading(true)
     setError('')
+    setProgress(url.trim() && !text.trim() ? 'Fetching page...' : 'Analyzing...')
     setAnalysisResult(null)
-    setChatContext('')
+    setSessionId('')
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/analyze`, {
-        text: text.trim() || null,
-        url: url.trim() || null,
-      })
-
-      setAnalysisResult(response.data)
-      setChatContext(response.data.summary)
+      let serverError = null
+      await streamAnalysis(
+        {
+          text: text.trim() || null,
+          url: url.trim() || null,
+        },
+        (event, data) => {
+          switch (event) {
+            case 'fetched':
+              setProgress(
+                data.revalidated
+                  ? 'Page unchanged since last fetch, extracting text...'
+                  : `Fetched page via ${data.strategy} (${formatBytes(data.bytes)}), extracting text...`
+              )
+              break
+            case 'extracted':
+              setProgress(`Extracted ${data.chars.toLocaleString()} characters, analyzing...`)
+              break
+            case 'rules':
+              // Quick rule-based result while the AI analysis finishes
+              setAnalysisResult((current) => current || { ...data, pending: true })
+              setProgress('Quick check done, waiting for the detailed analysis...')
+              break
+            case 'result':
+              setAnalysisResult(data)
+              setSessionId(data.session_id)
+              break
+            case 'error':
+              serverError = data
+              break
+            default:
+              break
+          }
+        }
+      )
+      if (serverError) {
+        setAnalysisResult(null)
+        throw new Error(serverError.detail)
+      }
     } catch (err) {
       let message =
-        err?.response?.data?.detail ||
         err?.message ||
         'Failed to analyze. Please check your connection and try again.'
 
@@ -44,8 +86,8 @@ function App() {
       if (
         !text.trim() &&
         url.trim() &&
-        !err?.response &&
-        (err?.message || '').toLowerCase().includes('network error')
+        err instanceof TypeError &&
+        (err?.message || '').toLowerCase().includes('fetch')
       ) {
         message =
           "We could not directly access this website's Terms & Conditions from your browser. " +
@@ -57,6 +99,7 @@ function App() {
       setError(message)
     } finally {
       setLoading(false)
+      setProgress('')
     }
   }
 
@@ -65,7 +108,7 @@ function App() {
     setUrl('')
     setError('')
     setAnalysisResult(null)
-    setChatContext('')
+    setSessionId('')
   }
 
   return (
@@ -122,6 +165,10 @@ function App() {
             </button>
           </div>
 
+          {loading && progress && (
+            <div className="progress-message">{progress}</div>
+          )}
+
           {error && (
             <div className="error-message">
               ⚠️ {error}
@@ -132,8 +179,8 @@ function App() {
         {analysisResult && (
           <>
             <AnalysisResult result={analysisResult} />
-            {chatContext && (
-              <ChatBox context={chatContext} />
+            {sessionId && (
+              <ChatBox sessionId={sessionId} context={analysisResult.summary} />
             )}
           </>
         )}
@@ -33,6 +33,17 @@ function AnalysisResult({ result }) {
       <div className="result-card">
         <h2>Analysis Summary</h2>
         <p className="summary-text">{result.summary}</p>
+        {result.pending && (
+          <p className="provisional-note">
+            Quick rule-based result. The detailed AI analysis is still running...
+          </p>
+        )}
+        {result.provisional && (
+          <p className="provisional-note">
+            Quick rule-based result: the detailed AI analysis is taking longer than usual.
+            Analyze again in a moment for the full result.
+          </p>
+        )}
       </div>
 
       <div className="result-card">
@@ -60,6 +71,20 @@ function AnalysisResult({ result }) {
           ))}
         </ul>
       </div>
+
+      {result.changed_clauses && result.changed_clauses.length > 0 && (
+        <div className="result-card">
+          <h2>Changes Since Last Analysis</h2>
+          <ul className="changes-list">
+            {result.changed_clauses.map((clause, index) => (
+              <li key={index} className={`change-item change-${clause.status}`}>
+                <span className="change-status">{clause.status}</span>
+                {clause.text}
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
     </div>
   )
 }
@@ -1,14 +1,18 @@
-import React, { useState } from 'react'
-import axios from 'axios'
+import React, { useEffect, useRef, useState } from 'react'
+import { postEventStream } from '../eventStream'
 import './ChatBox.css'
 
 const API_BASE_URL = 'http://localhost:8000'
 
-function ChatBox({ context }) {
+function ChatBox({ sessionId, context }) {
   const [question, setQuestion] = useState('')
   const [messages, setMessages] = useState([])
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
+  const abortRef = useRef(null)
+
+  // Stop a streaming answer when the chat goes away (e.g. a new analysis starts)
+  useEffect(() => () => abortRef.current?.abort(), [])
 
   const handleSubmit = async (e) => {
     e.preventDefault()
@@ -26,21 +30,39 @@ function ChatBox({ context }) {
     const newMessages = [...messages, { role: 'user', content: userMessage }]
     setMessages(newMessages)
 
-    try {
-      const response = await axios.post(`${API_BASE_URL}/chat`, {
-        question: userMessage,
-        context: context,
-      })
+    const controller = new AbortController()
+    abortRef.current = controller
 
-      const assistantMessage = {
-        role: 'assistant',
-        content: response.data.answer,
+    try {
+      // Show the answer as it is generated
+      let answer = ''
+      let serverError = null
+      await postEventStream(
+        `${API_BASE_URL}/chat/stream`,
+        {
+          question: userMessage,
+          session_id: sessionId,
+          // Used if the server no longer has the session (restart, other worker)
+          context,
+        },
+        (event, data) => {
+          if (event === 'token') {
+            answer += data.text
+            setMessages([...newMessages, { role: 'assistant', content: answer }])
+          } else if (event === 'error') {
+            serverError = data
+          }
+        },
+        controller.signal
+      )
+      if (serverError) {
+        throw new Error(serverError.detail)
       }
-
-      setMessages([...newMessages, assistantMessage])
     } catch (err) {
+      if (err.name === 'AbortError') {
+        return
+      }
       setError(
-        err.response?.data?.detail ||
         err.message ||
         'Failed to get response. Please try again.'
       )
@@ -94,7 +116,7 @@ function ChatBox({ context }) {
           ))
         )}
 
-        {loading && (
+        {loading && messages[messages.length - 1]?.role === 'user' && (
           <div className="message message-assistant">
             <div className="message-content">
               <span className="typing-indicator">Thinking...</span>
@@ -0,0 +1,33 @@
+// POST a JSON body and call onEvent(event, data) for every server-sent event in the response
+// (aborting the optional AbortSignal closes the connection)
+export const postEventStream = async (url, body, onEvent, signal) => {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+    signal,
+  })
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}))
+    throw new Error(error.detail || `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      const event = block.match(/^event: (.*)$/m)
+      const data = block.match(/^data: (.*)$/m)
+      if (event && data) {
+        onEvent(event[1], JSON.parse(data[1]))
+      }
+    }
+  }
+}